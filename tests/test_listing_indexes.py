@@ -0,0 +1,74 @@
+"""Keyset list pages must walk an index instead of sorting every row."""
+
+from pathlib import Path
+import os
+import sys
+
+import pytest
+
+APP_DIR = Path(__file__).resolve().parents[1] / "tier_synthesis"
+CURSOR = ("2024-01-01 00:00:00", 100)
+
+
+@pytest.fixture(scope="module")
+def app_modules(tmp_path_factory):
+    data_dir = tmp_path_factory.mktemp("data")
+    os.environ["DB_PATH"] = str(data_dir / "database.db")
+    os.environ["STORAGE_PATH"] = str(data_dir / "uploads")
+    os.chdir(APP_DIR)
+    sys.path.insert(0, str(APP_DIR))
+
+    from fasthtml.common import database
+    import main  # noqa: F401  creates every table, in the app's own order
+    from routers import images_router, tierlist_router
+    import migrations
+
+    migrations.create_listing_indexes(database(os.environ["DB_PATH"]))
+    return images_router, tierlist_router
+
+
+def query_plan(module, fetch) -> str:
+    """EXPLAIN QUERY PLAN of the last query `fetch` sends through `module.db`.
+
+    The plan comes from a fresh connection: EXPLAIN never executes, so the
+    router's own connection would not notice indexes created after it opened.
+    """
+    from fasthtml.common import database
+
+    captured = []
+    module.db.q = lambda sql, params=None: captured.append((sql, params)) or []
+    try:
+        fetch()
+    finally:
+        del module.db.q
+    sql, params = captured[-1]
+    plan = database(os.environ["DB_PATH"]).q(f"EXPLAIN QUERY PLAN {sql}", params)
+    return "\n".join(row["detail"] for row in plan)
+
+
+@pytest.mark.parametrize("is_admin", [True, False])
+@pytest.mark.parametrize("category", [None, "Cat"])
+@pytest.mark.parametrize("cursor", [None, CURSOR])
+def test_gallery_page_uses_index(app_modules, is_admin, category, cursor):
+    images_router, _ = app_modules
+    plan = query_plan(
+        images_router,
+        lambda: images_router.get_accessible_images(
+            "user", is_admin, category=category, cursor=cursor, limit=48
+        ),
+    )
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
+
+
+@pytest.mark.parametrize("is_admin", [True, False])
+@pytest.mark.parametrize("category", [None, "Cat"])
+@pytest.mark.parametrize("cursor", [None, CURSOR])
+def test_tierlist_page_uses_index(app_modules, is_admin, category, cursor):
+    _, tierlist_router = app_modules
+    plan = query_plan(
+        tierlist_router,
+        lambda: tierlist_router.get_accessible_tierlists(
+            "user", is_admin, category=category, cursor=cursor, limit=30
+        ),
+    )
+    assert "USE TEMP B-TREE FOR ORDER BY" not in plan, plan
@@ -1,6 +1,8 @@
 from fasthtml.common import *  # type: ignore
 from routers.base_layout import tag
-from routers.tierlist_router import TIER_TO_RATING, tierlist_to_ratings
+from routers.tierlist_router import TIER_TO_RATING
+from services.divergence import find_divergences
+from services.image_stats import get_category_baseline
 from components.image_grid import ImageGrid
 import os
 
@@ -47,45 +49,11 @@ def DivergentImage(div: dict, images_map: dict):
 def _calculate_divergence(user_id: str, category: str, limit: int = 8) -> list[dict]:
     """Calculate opinion divergence for a user in a category"""
     tierlists = db.q(
-        "SELECT id, owner_id, data FROM db_tierlist WHERE category = ?", [category]
+        "SELECT owner_id, category, data FROM db_tierlist WHERE category = ? AND owner_id = ? ORDER BY id",
+        [category, user_id],
     )
-
-    if len(tierlists) < 2:
+    if not tierlists:
         return []
 
-    image_ratings = {}
-    user_ratings = {}
-
-    for tl in tierlists:
-        ratings = tierlist_to_ratings(tl["data"])
-        owner_id = tl["owner_id"]
-
-        for img_id, rating in ratings.items():
-            if img_id not in image_ratings:
-                image_ratings[img_id] = []
-            image_ratings[img_id].append(rating)
-
-            if owner_id == user_id:
-                user_ratings[img_id] = rating
-
-    divergences = []
-    for img_id, user_rating in user_ratings.items():
-        if img_id in image_ratings and len(image_ratings[img_id]) > 1:
-            others_ratings = [r for r in image_ratings[img_id]]
-            avg_rating = sum(others_ratings) / len(others_ratings)
-
-            divergence = abs(user_rating - avg_rating)
-            is_higher = user_rating > avg_rating
-
-            if divergence > 1.0:
-                divergences.append(
-                    {
-                        "image_id": img_id,
-                        "user_rating": user_rating,
-                        "avg_rating": avg_rating,
-                        "divergence": divergence,
-                        "is_higher": is_higher,
-                    }
-                )
-
-    return sorted(divergences, key=lambda x: x["divergence"], reverse=True)[:limit]
+    baseline = get_category_baseline(db, [category])
+    return find_divergences(tierlists, user_id, limit, baseline=baseline).get(category, [])
@@ -1,14 +1,21 @@
 from fasthtml.common import *  # type: ignore
-from routers.tierlist_router import TIER_TO_RATING, tierlist_to_ratings
+from routers.tierlist_router import TIER_TO_RATING
+from services.image_stats import get_ranked_images
 from components.image_grid import ImageGrid
 import os
 
 db = database(os.environ.get("DB_PATH", "app/database.db"))
 
 
-def PopularImages(category: str, images_map: dict, limit: int = 8) -> Any:
-    """Render most and least popular images in a category"""
-    popular, unpopular = _get_popular_images(category, limit)
+def PopularImages(
+    category: str, images_map: dict, limit: int = 8, bayesian: bool = False
+) -> Any:
+    """Render most and least popular images in a category.
+
+    With `bayesian`, images are ranked by their Bayesian average so a couple
+    of extreme ratings can't put an image at the top or bottom.
+    """
+    popular, unpopular = _get_popular_images(category, limit, bayesian)
 
     if not popular and not unpopular:
         return None
@@ -62,40 +69,9 @@ def _PopularityCard(item: dict, images_map: dict, is_popular: bool) -> Any:
 
 
 def _get_popular_images(
-    category: str, limit: int = 10
+    category: str, limit: int = 10, bayesian: bool = False
 ) -> tuple[list[dict], list[dict]]:
     """Get most and least popular images by average rating"""
-    tierlists = db.q(
-        "SELECT id, owner_id, data FROM db_tierlist WHERE category = ?", [category]
-    )
-
-    if not tierlists:
-        return [], []
-
-    image_ratings = {}
-
-    for tl in tierlists:
-        ratings = tierlist_to_ratings(tl["data"])
-        for img_id, rating in ratings.items():
-            if img_id not in image_ratings:
-                image_ratings[img_id] = []
-            image_ratings[img_id].append(rating)
-
-    image_averages = []
-    for img_id, ratings in image_ratings.items():
-        if len(ratings) >= 2:
-            avg_rating = sum(ratings) / len(ratings)
-            image_averages.append(
-                {
-                    "image_id": img_id,
-                    "avg_rating": avg_rating,
-                    "rating_count": len(ratings),
-                }
-            )
-
-    sorted_images = sorted(image_averages, key=lambda x: x["avg_rating"], reverse=True)
-
-    popular = sorted_images[:limit]
-    unpopular = sorted_images[-limit:][::-1]
-
+    popular = get_ranked_images(db, category, limit, descending=True, bayesian=bayesian)
+    unpopular = get_ranked_images(db, category, limit, descending=False, bayesian=bayesian)
     return popular, unpopular
@@ -0,0 +1,46 @@
+from fasthtml.common import *  # type: ignore
+from components.user_display import UserDisplay
+from services.taste_index import get_taste_index
+
+
+def SimilarUsers(user_id: str, viewer_id: str, is_admin: bool, limit: int = 5):
+    """Render the people whose taste across categories is closest to `user_id`"""
+    matches = _find_similar_users(user_id, viewer_id, is_admin, limit)
+    if not matches:
+        return None
+
+    index = get_taste_index()
+    return Ul(
+        *[
+            Li(
+                UserDisplay(other_id, viewer_id),
+                Small(
+                    f"{int(similarity * 100)}% similar · "
+                    + ", ".join(index.categories_in_common(user_id, other_id))
+                ),
+            )
+            for other_id, similarity in matches
+        ],
+        cls="similar-users",
+    )
+
+
+def _find_similar_users(
+    user_id: str, viewer_id: str, is_admin: bool, limit: int
+) -> list[tuple[str, float]]:
+    """Nearest users in the taste index that the viewer is allowed to see"""
+    from routers.users_router import get_shared_group_users
+
+    index = get_taste_index()
+    if not len(index):
+        # Nothing factorized yet in this database; fill the index in the background.
+        from routers.category_utils import get_all_categories
+        from routers.latent_router import schedule_taste_refresh
+
+        schedule_taste_refresh(*get_all_categories())
+        return []
+
+    if is_admin:
+        return index.most_similar(user_id, limit)
+    visible = get_shared_group_users(viewer_id) | {viewer_id}
+    return index.most_similar(user_id, limit, allowed=visible.__contains__)
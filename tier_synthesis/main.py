@@ -4,6 +4,9 @@ from fasthtml.oauth import DiscordAppClient
 from fasthtml.components import Zero_md
 from routers.base_layout import get_full_layout
 from routers import get_api_routers
+from routers.users_router import get_user_context
+from routers.compression import ConditionalCompressionMiddleware, precompress_static
+from services.invalidation import UserChanged, publish
 from dataclasses import dataclass
 import logging
 import httpx
@@ -45,20 +48,20 @@ users = db.create(
 
 def before(req, session):
     auth = req.scope["auth"] = session.get("user_id", None)
-    if not auth or auth not in users:
+    context = get_user_context(auth) if auth else None
+    if context is None:
         if auth:
             session.clear()
         return RedirectResponse("/login", status_code=303)
 
-    user = users[auth]
-    admin_user_id = os.environ.get("ADMIN_USER_ID", "")
-    is_admin = user.is_admin or (auth == admin_user_id)
+    is_admin = context.is_admin
+    req.scope["user_context"] = context
     req.scope["is_admin"] = is_admin
 
     if req.url.path.startswith("/admin/") and not is_admin:
         return RedirectResponse("/unauthorized", status_code=303)
 
-    if not is_local_dev() and not user.authorized and not is_admin:
+    if not is_local_dev() and not context.user.authorized and not is_admin:
         return RedirectResponse("/unauthorized", status_code=303)
 
 
@@ -104,6 +107,18 @@ def on_startup():
     from migrations import run_migrations
 
     run_migrations()
+    if os.environ.get("PRECOMPRESS_STATIC", "true").lower() == "true":
+        precompress_static()
+
+
+def on_shutdown():
+    from routers.tierlist_router import flush_all_autosaves
+    from routers.latent_router import shutdown_analysis_workers
+    from services.nmf_selection import shutdown_executor
+
+    flush_all_autosaves()
+    shutdown_analysis_workers()
+    shutdown_executor()
 
 
 app, rt = fast_app(
@@ -125,11 +140,13 @@ app, rt = fast_app(
                 defer=True,
                 src="https://cdn.jsdelivr.net/npm/alpinejs@3.x.x/dist/cdn.min.js",
             ),
+            Script(src="https://cdn.jsdelivr.net/npm/htmx-ext-sse@2.2.2/sse.js"),
         ],
     ),
     htmlkw={"lang": "en", "charset": "utf-8"},
     before=bware,
     on_startup=[on_startup],
+    on_shutdown=[on_shutdown],
     exception_handlers={404: _not_found, 500: _server_error},
     debug=os.environ.get("DEBUG", "false").lower() == "true",
     sess_https_only=not is_local_dev(),
@@ -137,6 +154,11 @@ app, rt = fast_app(
 )
 
 
+# Registered first so it runs inside security_headers, which then also
+# stamps the 304s and compressed responses it produces.
+app.add_middleware(ConditionalCompressionMiddleware)
+
+
 @app.middleware("http")
 async def security_headers(request, call_next):
     response = await call_next(request)
@@ -149,6 +171,9 @@ async def security_headers(request, call_next):
         cache_control = response.headers.get(
             "Cache-Control", "public, max-age=31536000, immutable"
         )
+    elif "ETag" in response.headers:
+        # Revalidated per viewer, so shared caches must not keep a copy.
+        cache_control = "private, no-cache"
     else:
         cache_control = "no-cache"
 
@@ -253,6 +278,7 @@ async def auth_redirect(
                     is_admin=(user_id == admin_user_id),
                 )
             )
+            publish(UserChanged(user_id))
         session["user_id"] = user_id
     else:
         client = get_discord_client()
@@ -273,6 +299,17 @@ async def auth_redirect(
                     is_admin=(user_data["id"] == admin_user_id),
                 )
             )
+            publish(UserChanged(user_data["id"]))
+        else:
+            user = users[user_data["id"]]
+            if (user.username, user.avatar) != (
+                user_data["username"],
+                user_data["avatar"],
+            ):
+                user.username = user_data["username"]
+                user.avatar = user_data["avatar"]
+                users.update(user)
+                publish(UserChanged(user.id))
     return RedirectResponse("/", status_code=303)
 
 
@@ -16,6 +16,10 @@ def run_migrations():
     logger.info("Running migrations...")
     migrate_categories(db)
     migrate_image_file_paths(db)
+    migrate_tierlist_data_encoding(db)
+    repair_tierlist_counters(db, only_missing=True)
+    backfill_image_rating_stats(db)
+    create_listing_indexes(db)
     logger.info("Migrations complete")
 
 
@@ -105,3 +109,122 @@ def migrate_image_file_paths(db):
             logger.error(f"Failed to migrate image {image.id}: {e}")
 
     logger.info("Image file path migration complete")
+
+
+def migrate_tierlist_data_encoding(db):
+    from services.tierlist_codec import decode_tierlist, encode_tierlist
+
+    if "db_tierlist" not in db.table_names():
+        return
+
+    legacy_rows = db.q("SELECT id, data FROM db_tierlist WHERE typeof(data) = 'text'")
+    if not legacy_rows:
+        logger.info("All tierlists already use the binary encoding")
+        return
+
+    logger.info(f"Re-encoding {len(legacy_rows)} tierlists from JSON...")
+    converted = []
+    for row in legacy_rows:
+        try:
+            converted.append((encode_tierlist(decode_tierlist(row['data'])), row['id']))
+        except Exception as e:
+            logger.error(f"Failed to re-encode tierlist {row['id']}: {e}")
+
+    with db.conn:
+        db.conn.executemany("UPDATE db_tierlist SET data = ? WHERE id = ?", converted)
+
+    logger.info(f"Tierlist encoding migration complete: {len(converted)} tierlists converted")
+
+
+def repair_tierlist_counters(db, only_missing=False):
+    """Recompute db_tierlist love/tomato/comment counts from the source tables.
+
+    With `only_missing`, only rows whose counters were never filled in (rows
+    created before the columns existed) are touched.
+    """
+    if not {"db_tierlist", "tierlist_rating", "tierlist_comment"} <= set(db.table_names()):
+        return 0
+
+    where = (
+        "WHERE love_count IS NULL OR tomato_count IS NULL OR comment_count IS NULL"
+        if only_missing
+        else ""
+    )
+    with db.conn:
+        db.conn.execute(f"""
+            UPDATE db_tierlist SET
+                love_count = (SELECT COUNT(*) FROM tierlist_rating r WHERE r.tierlist_id = db_tierlist.id AND r.rating = 1),
+                tomato_count = (SELECT COUNT(*) FROM tierlist_rating r WHERE r.tierlist_id = db_tierlist.id AND r.rating = -1),
+                comment_count = (SELECT COUNT(*) FROM tierlist_comment c WHERE c.tierlist_id = db_tierlist.id)
+            {where}
+        """)
+        repaired = db.conn.changes()
+
+    if repaired or not only_missing:
+        logger.info(f"Tierlist counters recomputed for {repaired} tierlists")
+    return repaired
+
+
+# Keyset pages read (created_at, id) DESC, optionally within one category.
+LISTING_INDEXES = {
+    "idx_db_image_created": ("db_image", "created_at DESC, id DESC"),
+    "idx_db_image_category_created": ("db_image", "category, created_at DESC, id DESC"),
+    "idx_db_tierlist_created": ("db_tierlist", "created_at DESC, id DESC"),
+    "idx_db_tierlist_category_created": ("db_tierlist", "category, created_at DESC, id DESC"),
+}
+
+
+def create_listing_indexes(db):
+    """Index the gallery and tierlist list order so a page reads only its rows."""
+    tables = set(db.table_names())
+    for name, (table, columns) in LISTING_INDEXES.items():
+        if table in tables:
+            db.execute(f"CREATE INDEX IF NOT EXISTS {name} ON {table} ({columns})")
+
+
+def backfill_image_rating_stats(db):
+    """Fill image_rating_stats once for databases that predate the table."""
+    if not {"db_tierlist", "image_rating_stats"} <= set(db.table_names()):
+        return
+    if db.q("SELECT 1 FROM image_rating_stats LIMIT 1"):
+        return
+    if not db.q("SELECT 1 FROM db_tierlist LIMIT 1"):
+        return
+    rebuild_image_rating_stats(db)
+
+
+def rebuild_image_rating_stats(db):
+    """Recompute the per-category image rating aggregates from every tierlist."""
+    from services.image_stats import rebuild_image_rating_stats as rebuild
+
+    if not {"db_tierlist", "image_rating_stats"} <= set(db.table_names()):
+        return 0
+    rebuilt = rebuild(db)
+    logger.info(f"Image rating stats rebuilt: {rebuilt} (category, image) rows")
+    return rebuilt
+
+
+def prune_category_models(db):
+    """Apply the category_model retention policy to every category."""
+    from services.model_store import prune_category_models as prune
+
+    if "category_model" not in db.table_names():
+        return 0
+    pruned = prune(db)
+    logger.info(f"Pruned {pruned} stored category models")
+    return pruned
+
+
+if __name__ == "__main__":
+    import sys
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    commands = {
+        "repair-counters": repair_tierlist_counters,
+        "rebuild-image-stats": rebuild_image_rating_stats,
+        "prune-category-models": prune_category_models,
+    }
+    if len(sys.argv) != 2 or sys.argv[1] not in commands:
+        sys.exit(f"Usage: python migrations.py [{'|'.join(commands)}]")
+
+    commands[sys.argv[1]](database(os.environ.get("DB_PATH", "app/database.db")))
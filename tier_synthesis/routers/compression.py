@@ -0,0 +1,292 @@
+"""Revalidation and compression for pages, fragments and static text.
+
+Rendered pages repeat the same Alpine handlers on every tile, so they
+shrink several-fold. Brotli is used when the `brotli` package is installed
+and the client accepts it, gzip otherwise. Images (already compressed) and
+`text/event-stream` (must stream) are never buffered or touched.
+"""
+
+from fasthtml.common import *  # type: ignore
+from .conditional import BODY_HEADERS, body_etag, etag_matches
+from dataclasses import dataclass
+from pathlib import Path
+from starlette.datastructures import Headers
+import gzip
+import hashlib
+import mimetypes
+import os
+import logging
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+logger = logging.getLogger(__name__)
+
+
+COMPRESSION_MIN_SIZE = int(os.environ.get("COMPRESSION_MIN_SIZE", 1024))
+COMPRESSIBLE_TYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+# Never compressed whatever their content type claims.
+EXCLUDED_PATHS = ("/images/img",)
+PRECOMPRESSED_STATIC = ("static/styles.css",)
+
+# Per-response levels favour speed; precompressed files are done once.
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def _compress(body: bytes, encoding: str, best: bool = False) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=11 if best else BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=9 if best else GZIP_LEVEL, mtime=0)
+
+
+def choose_encoding(accept_encoding: str) -> str | None:
+    """Best encoding we can produce that `accept_encoding` allows."""
+    accepted = set()
+    for item in accept_encoding.lower().split(","):
+        coding, _, params = item.strip().partition(";")
+        quality = params.strip().removeprefix("q=")
+        try:
+            if params and float(quality) <= 0:
+                continue
+        except ValueError:
+            continue
+        accepted.add(coding.strip())
+    if brotli is not None and "br" in accepted:
+        return "br"
+    if "gzip" in accepted:
+        return "gzip"
+    return None
+
+
+def _variant_etag(etag: str, encoding: str) -> str:
+    """A strong ETag names exact bytes, so each encoding needs its own."""
+    if not etag or etag.startswith("W/"):
+        return etag
+    return f'{etag[:-1]}-{encoding}"'
+
+
+# ============================================================================
+# PRECOMPRESSED STATIC FILES
+# ============================================================================
+
+
+@dataclass
+class PrecompressedFile:
+    mtime: float
+    content_type: str
+    etag: str
+    variants: dict[str, bytes]
+
+
+# URL path -> file compressed at startup
+_precompressed: dict[str, PrecompressedFile] = {}
+
+
+def precompress_static(*paths: str) -> None:
+    """Compress static files once at the best levels; served from memory."""
+    for path in paths or PRECOMPRESSED_STATIC:
+        try:
+            source = Path(path)
+            body = source.read_bytes()
+            encodings = ["gzip"] + (["br"] if brotli is not None else [])
+            media_type = mimetypes.guess_type(source.name)[0] or "text/plain"
+            _precompressed["/" + source.as_posix()] = PrecompressedFile(
+                mtime=source.stat().st_mtime,
+                content_type=f"{media_type}; charset=utf-8",
+                etag=f'"{hashlib.md5(body).hexdigest()}"',
+                variants={
+                    encoding: _compress(body, encoding, best=True)
+                    for encoding in encodings
+                },
+            )
+            logger.info(f"Precompressed {path} ({len(body)} bytes, {', '.join(encodings)})")
+        except OSError:
+            logger.exception(f"Could not precompress {path}")
+
+
+def _fresh_precompressed(url_path: str) -> PrecompressedFile | None:
+    entry = _precompressed.get(url_path)
+    if entry is None:
+        return None
+    try:
+        if Path(url_path.lstrip("/")).stat().st_mtime != entry.mtime:
+            return None
+    except OSError:
+        return None
+    return entry
+
+
+# ============================================================================
+# MIDDLEWARE
+# ============================================================================
+
+
+def _merge_vary(headers: list[tuple[bytes, bytes]], *names: str) -> list[tuple[bytes, bytes]]:
+    """Fold every Vary line plus `names` into one, keeping each value once."""
+    values: dict[str, str] = {}
+    for name, value in headers:
+        if name == b"vary":
+            for item in value.decode("latin-1").split(","):
+                if item.strip():
+                    values.setdefault(item.strip().lower(), item.strip())
+    for item in names:
+        values.setdefault(item.lower(), item)
+    merged = [(name, value) for name, value in headers if name != b"vary"]
+    if values:
+        merged.append((b"vary", ", ".join(values.values()).encode("latin-1")))
+    return merged
+
+
+class ConditionalCompressionMiddleware:
+    """ETags, 304s and compression for HTML, fragments and static text.
+
+    A response is buffered at most once. HTML GETs keep the handler's
+    versioned ETag or get one hashed from the body, and a matching
+    If-None-Match is answered with an empty 304. Text of at least
+    `COMPRESSION_MIN_SIZE` bytes is then compressed, and a strong ETag gets
+    a per-encoding suffix. Precompressed static files are answered from
+    memory without running the file handler.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request = Request(scope)
+        encoding = choose_encoding(request.headers.get("accept-encoding", ""))
+        if (
+            request.method in ("GET", "HEAD")
+            and encoding is not None
+            and "range" not in request.headers
+            and (entry := _fresh_precompressed(request.url.path)) is not None
+            and encoding in entry.variants
+        ):
+            await self._send_precompressed(request, entry, encoding, send)
+            return
+
+        start = None
+        chunks: list[bytes] = []
+
+        async def buffered_send(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                if self._wants_body(request, message):
+                    start = message
+                else:
+                    await send(message)
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                await self._finish(request, encoding, start, b"".join(chunks), send)
+
+        await self.app(scope, receive, buffered_send)
+
+    @staticmethod
+    def _is_html(request, message) -> bool:
+        headers = Headers(raw=message["headers"])
+        return (
+            request.method in ("GET", "HEAD")
+            and message["status"] == 200
+            and headers.get("content-type", "").startswith("text/html")
+        )
+
+    @staticmethod
+    def _is_compressible(request, message) -> bool:
+        headers = Headers(raw=message["headers"])
+        return not (
+            request.method == "HEAD"
+            or not headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            or request.url.path.startswith(EXCLUDED_PATHS)
+            or "content-encoding" in headers
+            or "content-range" in headers
+            or message["status"] in (204, 206, 304)
+        )
+
+    def _wants_body(self, request, message) -> bool:
+        return self._is_html(request, message) or self._is_compressible(request, message)
+
+    async def _finish(self, request, encoding, start, body, send) -> None:
+        headers = [
+            (name, value)
+            for name, value in start["headers"]
+            if name not in (b"etag", b"content-length")
+        ]
+        etag = Headers(raw=start["headers"]).get("etag")
+
+        if self._is_html(request, start):
+            # A HEAD body is empty, so only a handler's ETag describes it.
+            if etag is None and request.method == "GET":
+                etag = body_etag(body)
+            if etag is not None and etag_matches(request, etag):
+                await send({
+                    "type": "http.response.start",
+                    "status": 304,
+                    "headers": [
+                        *(item for item in headers if item[0] not in BODY_HEADERS),
+                        (b"etag", etag.encode("latin-1")),
+                    ],
+                })
+                await send({"type": "http.response.body", "body": b""})
+                return
+
+        if request.method == "HEAD":
+            content_length = Headers(raw=start["headers"]).get("content-length")
+        else:
+            content_length = str(len(body))
+        if self._is_compressible(request, start):
+            headers = _merge_vary(headers, "Accept-Encoding")
+            if encoding is not None and len(body) >= COMPRESSION_MIN_SIZE:
+                compressed = _compress(body, encoding)
+                if len(compressed) < len(body):
+                    body = compressed
+                    content_length = str(len(body))
+                    headers.append((b"content-encoding", encoding.encode("latin-1")))
+                    if etag is not None:
+                        etag = _variant_etag(etag, encoding)
+
+        if etag is not None:
+            headers.append((b"etag", etag.encode("latin-1")))
+        if content_length is not None:
+            headers.append((b"content-length", content_length.encode("latin-1")))
+        await send({**start, "headers": headers})
+        await send({"type": "http.response.body", "body": body})
+
+    @staticmethod
+    async def _send_precompressed(request, entry, encoding, send) -> None:
+        etag = _variant_etag(entry.etag, encoding)
+        headers = [
+            (b"etag", etag.encode("latin-1")),
+            (b"vary", b"Accept-Encoding"),
+        ]
+        if etag_matches(request, etag):
+            status, body = 304, b""
+        else:
+            status, body = 200, entry.variants[encoding]
+            headers += [
+                (b"content-type", entry.content_type.encode("latin-1")),
+                (b"content-encoding", encoding.encode("latin-1")),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ]
+        await send({"type": "http.response.start", "status": status, "headers": headers})
+        await send({
+            "type": "http.response.body",
+            "body": b"" if request.method == "HEAD" else body,
+        })
@@ -0,0 +1,78 @@
+from fasthtml.common import *  # type: ignore
+from services.data_versions import GLOBAL_KEY, VersionKey, get_versions, user_key
+import hashlib
+import time
+
+# Headers that switch a route between a full page and an htmx partial.
+HTMX_VARY = ("HX-Request", "HX-History-Restore-Request", "HX-Boosted", "HX-Target")
+# FastHTML already sends Vary for these on every response it renders.
+FASTHTML_VARY = ("HX-Request", "HX-History-Restore-Request")
+
+
+def versioned_etag(request, *keys: VersionKey) -> str:
+    """Weak ETag for a page built from the data behind `keys`.
+
+    Also covers the viewer (their own and the global version), the exact URL,
+    the htmx headers and the day, since signed image URLs roll over daily.
+    """
+    viewer = request.scope.get("auth")
+    versions = get_versions(GLOBAL_KEY, user_key(viewer), *keys)
+    parts = (
+        request.url.path,
+        request.url.query,
+        viewer,
+        request.scope.get("is_admin", False),
+        tuple(request.headers.get(header, "") for header in HTMX_VARY),
+        versions,
+        int(time.time()) // 86400,
+    )
+    return f'W/"{hashlib.sha1(repr(parts).encode()).hexdigest()[:20]}"'
+
+
+def _validator_headers(etag: str, vary=HTMX_VARY) -> dict[str, str]:
+    return {
+        "ETag": etag,
+        "Cache-Control": "private, no-cache",
+        "Vary": ", ".join(vary),
+    }
+
+
+def _opaque(etag: str) -> str:
+    return etag.strip().removeprefix("W/")
+
+
+def etag_matches(request, etag: str) -> bool:
+    """Weak comparison of `etag` against the request's If-None-Match."""
+    if request.method not in ("GET", "HEAD"):
+        return False
+    presented = request.headers.get("If-None-Match", "")
+    if presented.strip() == "*":
+        return True
+    return _opaque(etag) in (_opaque(tag) for tag in presented.split(","))
+
+
+def not_modified(request, etag: str) -> Response | None:
+    """A 304 when the client already holds `etag`, otherwise None."""
+    if not etag_matches(request, etag):
+        return None
+    return Response(status_code=304, headers=_validator_headers(etag))
+
+
+def with_etag(response, etag: str) -> tuple:
+    """Attach `etag` and its revalidation headers to a handler's return value."""
+    parts = response if isinstance(response, tuple) else (response,)
+    vary = [header for header in HTMX_VARY if header not in FASTHTML_VARY]
+    headers = _validator_headers(etag, vary)
+    return *parts, *[HttpHeader(k, v) for k, v in headers.items()]
+
+
+# ============================================================================
+# BODY ETAGS
+# ============================================================================
+
+# Dropped from a 304, which has no body to describe.
+BODY_HEADERS = {b"content-length", b"content-type", b"content-encoding"}
+
+
+def body_etag(body: bytes) -> str:
+    return f'W/"{hashlib.sha1(body).hexdigest()[:20]}"'
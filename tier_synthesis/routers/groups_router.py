@@ -1,6 +1,7 @@
 from fasthtml.common import *  # type: ignore
 from .base_layout import get_full_layout, list_item
 from components.modal import Modal, ModalOpenButton, ModalCloseButton
+from services.invalidation import GroupsChanged, publish
 from dataclasses import dataclass
 import os
 import logging
@@ -180,6 +181,7 @@ def create_group(groupname: str, htmx, request):
 def delete_group(group_id: str, htmx, request):
     logger.info(f"Deleting group {group_id}")
     user_groups.delete(group_id)
+    publish(GroupsChanged())
     return list_groups(htmx, request)
 
 
@@ -261,6 +263,7 @@ def get_member_options(group_id: str):
 @ar_groups.post("/id/{group_id}/add-member")
 def add_member(group_id: str, member_user_id: str, htmx, request):
     user_group_membership.insert({"user_id": member_user_id, "group_id": group_id})
+    publish(GroupsChanged())
     logger.info(f"Added user {member_user_id} to group {group_id}")
     return view_group(group_id, htmx, request)
 
@@ -270,6 +273,7 @@ def remove_user_from_group(membership_id: str, htmx, request):
     group_id = user_group_membership[membership_id].group_id
     logger.info(f"Removing membership {membership_id}")
     user_group_membership.delete(membership_id)
+    publish(GroupsChanged())
     return view_group(group_id, htmx, request)
 
 
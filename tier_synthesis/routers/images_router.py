@@ -1,4 +1,6 @@
 from fasthtml.common import *  # type: ignore
+import asyncio
+import time
 import uuid
 from datetime import datetime
 from io import BytesIO
@@ -6,7 +8,12 @@ from pathlib import Path
 from PIL import Image
 from dataclasses import dataclass
 from .base_layout import get_full_layout, tag
+from .share_utils import parse_group_ids, sync_shares, insert_shares
+from .pagination import decode_cursor, keyset_condition, split_page, page_url, LoadMore
+from .conditional import not_modified, versioned_etag, with_etag
 from services.storage import get_storage_service
+from services.invalidation import CategoryChanged, publish
+from services.data_versions import list_page_keys
 from components.image_cropper import ImageCropperJS, CroppableImageInput
 import logging
 
@@ -72,15 +79,9 @@ ar_images.show = True  # type: ignore
 
 
 def get_user_groups_for_user(user_id: str) -> list[dict]:
-    return db.q(
-        """
-        SELECT user_group.*
-        FROM user_group
-        JOIN user_group_membership ON user_group.id = user_group_membership.group_id
-        WHERE user_group_membership.user_id = ?
-        """,
-        [user_id],
-    )
+    from .users_router import get_user_groups
+
+    return get_user_groups(user_id)
 
 
 def get_shared_group_ids(image_id: int) -> list[int]:
@@ -109,28 +110,57 @@ def can_access_image(image_id: int, user_id: str, is_admin: bool):
     return len(result) > 0
 
 
-def get_accessible_images(user_id: str, is_admin: bool):
-    if is_admin:
-        result = db.q("SELECT * FROM db_image ORDER BY created_at DESC")
-    else:
-        result = db.q(
-            """
-            SELECT DISTINCT i.*
-            FROM db_image i
-            LEFT JOIN image_share s ON i.id = s.image_id
-            LEFT JOIN user_group_membership m ON s.user_group_id = m.group_id
-            WHERE i.owner_id = ? OR m.user_id = ?
-            ORDER BY i.created_at DESC
-            """,
-            [user_id, user_id],
+def get_accessible_images(
+    user_id: str,
+    is_admin: bool,
+    category: str | None = None,
+    owner_id: str | None = None,
+    cursor: tuple[str, int] | None = None,
+    limit: int | None = None,
+) -> list[DBImage]:
+    """Images visible to the user, newest first, optionally one keyset page.
+
+    With `limit`, one extra row is fetched so `split_page` can tell whether
+    another page follows.
+    """
+    conditions, params = [], []
+    if not is_admin:
+        conditions.append(
+            """(i.owner_id = ? OR EXISTS (
+                SELECT 1 FROM image_share s
+                JOIN user_group_membership m ON s.user_group_id = m.group_id
+                WHERE s.image_id = i.id AND m.user_id = ?
+            ))"""
         )
+        params += [user_id, user_id]
+    if category:
+        conditions.append("i.category = ?")
+        params.append(category)
+    if owner_id:
+        conditions.append("i.owner_id = ?")
+        params.append(owner_id)
+    if cursor:
+        condition, cursor_params = keyset_condition("i", cursor)
+        conditions.append(condition)
+        params += cursor_params
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit_clause = f"LIMIT {int(limit) + 1}" if limit is not None else ""
+    result = db.q(
+        f"""
+        SELECT i.* FROM db_image i
+        {where}
+        ORDER BY i.created_at DESC, i.id DESC
+        {limit_clause}
+        """,
+        params,
+    )
 
     return [DBImage(**row) for row in result]
 
 
 def get_category_images(category: str, user_id: str, is_admin: bool) -> list[DBImage]:
-    accessible_images = get_accessible_images(user_id, is_admin)
-    return [img for img in accessible_images if img.category == category]
+    return get_accessible_images(user_id, is_admin, category=category)
 
 
 # ============================================================================
@@ -166,10 +196,10 @@ def category_input(
     )
 
 
-def get_image_card(image, user_id: str):
+def get_image_card(image, user_id: str, owner: tuple[str, str] | None = None):
     from .users_router import get_user_avatar
 
-    username, avatar_url = get_user_avatar(image.owner_id)
+    username, avatar_url = owner or get_user_avatar(image.owner_id)
     storage = get_storage_service()
     thumbnail_url = storage.generate_signed_url(image.thumbnail_path)
 
@@ -194,9 +224,12 @@ def get_image_card(image, user_id: str):
 
 
 def get_image_cards(images, user_id: str):
+    from .users_router import get_user_avatars
+
+    avatars = get_user_avatars(image.owner_id for image in images)
     return [
         A(
-            get_image_card(image, user_id),
+            get_image_card(image, user_id, avatars[image.owner_id]),
             href=f"/images/id/{image.id}",
             hx_boost="true",
             hx_target="#main",
@@ -205,9 +238,10 @@ def get_image_cards(images, user_id: str):
     ]
 
 
-def get_image_grid(images, user_id: str):
+def get_image_grid(images, user_id: str, next_url: str | None = None):
     return Grid(
         *get_image_cards(images, user_id),
+        LoadMore(next_url),
         cls="flex-wrap",
     )
 
@@ -369,7 +403,19 @@ def ImageUploadPage(categories: list[str], user_groups: list[dict]) -> Any:
                     if user_groups
                     else None
                 ),
-                Button("Upload"),
+                Group(
+                    Button("Upload"),
+                    Button(
+                        "Upload as batch",
+                        type="button",
+                        hx_validate="true",
+                        hx_post=f"{ar_images.prefix}/batch",
+                        hx_encoding="multipart/form-data",
+                        hx_target="#batch-status",
+                        hx_swap="innerHTML",
+                        cls="secondary",
+                    ),
+                ),
             ),
             enctype="multipart/form-data",
             hx_post=f"{ar_images.prefix}/new",
@@ -380,17 +426,42 @@ def ImageUploadPage(categories: list[str], user_groups: list[dict]) -> Any:
             hx_swap="afterbegin",
             hx_on__after_request="this.reset()",
         ),
+        Div(id="batch-status"),
         H2("👇 Uploaded images 👇", align="center"),
         Grid(id="image-list", cls="flex-wrap"),
     )
 
 
+def BatchUploadStatus(job_id: str, total: int, done: int = 0, failed: int = 0) -> Any:
+    return Div(
+        Progress(value=done + failed, max=total),
+        Small(
+            f"{done} of {total} uploaded"
+            + (f", {failed} failed" if failed else "")
+        ),
+        id=f"batch-progress-{job_id}",
+    )
+
+
+def BatchUploadStream(job_id: str, total: int) -> Any:
+    return Div(
+        BatchUploadStatus(job_id, total),
+        Div(sse_swap="progress", hx_target=f"#batch-progress-{job_id}", hx_swap="outerHTML"),
+        Div(sse_swap="card", hx_target="#image-list", hx_swap="afterbegin"),
+        Div(sse_swap="failure", hx_swap="beforeend"),
+        hx_ext="sse",
+        sse_connect=f"{ar_images.prefix}/batch/{job_id}/events",
+        sse_close="done",
+    )
+
+
 def ImageGalleryPage(
     filtered_images: list[Any],
     user_id: str,
     categories: list[str],
     selected_category: str,
     mine_only: bool,
+    next_url: str | None = None,
 ) -> Any:
     return (
         H1("Image Gallery"),
@@ -420,7 +491,7 @@ def ImageGalleryPage(
             ),
             style="display: flex; gap: 1rem; align-items: center; margin-bottom: 1rem;",
         ),
-        get_image_grid(filtered_images, user_id),
+        get_image_grid(filtered_images, user_id, next_url),
     )
 
 
@@ -445,17 +516,16 @@ def process_image(img_data):
     return buffer.getvalue()
 
 
-async def get_safe_image_data(image: UploadFile) -> tuple[bytes, str]:
-    ALLOWED_MIME_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
-    MAX_IMAGE_SIZE = 10 * 1024 * 1024
+ALLOWED_MIME_TYPES = {"image/jpeg", "image/png", "image/gif", "image/webp"}
+MAX_IMAGE_SIZE = 10 * 1024 * 1024
 
-    if image.content_type not in ALLOWED_MIME_TYPES:
-        raise ValueError(f"Invalid file type: {image.content_type}")
 
-    image_data = await image.read()
+def validate_image_data(image_data: bytes, content_type: str, filename: str) -> None:
+    if content_type not in ALLOWED_MIME_TYPES:
+        raise ValueError(f"Invalid file type: {content_type}")
 
     if len(image_data) > MAX_IMAGE_SIZE:
-        raise ValueError(f"File too large: {image.filename}")
+        raise ValueError(f"File too large: {filename}")
 
     img = Image.open(BytesIO(image_data))
     img.verify()
@@ -463,10 +533,25 @@ async def get_safe_image_data(image: UploadFile) -> tuple[bytes, str]:
     img = Image.open(BytesIO(image_data))
     img.load()
 
+
+async def get_safe_image_data(image: UploadFile) -> tuple[bytes, str]:
+    if image.content_type not in ALLOWED_MIME_TYPES:
+        raise ValueError(f"Invalid file type: {image.content_type}")
+
+    image_data = await image.read()
+    validate_image_data(image_data, image.content_type, image.filename)
+
     return image_data, image.content_type
 
 
-async def save_uploaded_image(image: DBImage, uploaded_file: UploadFile) -> None:
+async def prepare_uploaded_image(uploaded_file: UploadFile) -> tuple[bytes, str, bytes]:
+    image_data, content_type = await get_safe_image_data(uploaded_file)
+    return image_data, content_type, process_image(image_data)
+
+
+def store_image_files(
+    image: DBImage, image_data: bytes, content_type: str, thumbnail_data: bytes
+) -> None:
     storage = get_storage_service()
 
     if image.thumbnail_path:
@@ -474,9 +559,6 @@ async def save_uploaded_image(image: DBImage, uploaded_file: UploadFile) -> None
     if image.full_image_path:
         storage.delete_image(image.full_image_path)
 
-    image_data, content_type = await get_safe_image_data(uploaded_file)
-    thumbnail_data = process_image(image_data)
-
     image.thumbnail_path = storage.save_image(
         thumbnail_data, image.id, content_type, is_thumbnail=True
     )
@@ -487,6 +569,10 @@ async def save_uploaded_image(image: DBImage, uploaded_file: UploadFile) -> None
     image.thumbnail_data = b""
 
 
+async def save_uploaded_image(image: DBImage, uploaded_file: UploadFile) -> None:
+    store_image_files(image, *await prepare_uploaded_image(uploaded_file))
+
+
 # ============================================================================
 # FEATURE: IMAGE SERVING
 # ============================================================================
@@ -596,19 +682,21 @@ async def post_image_edit_form(
             P(f"Category error: {e}", cls="error-text"), htmx, is_admin
         )
 
+    previous_category = image.category
     image.name = name
     image.category = validated_category
 
     if new_uploaded_image:
         await save_uploaded_image(image, new_uploaded_image)
 
-    images.update(image)
-
-    db.q("DELETE FROM image_share WHERE image_id = ?", [id])
-    if shared_groups:
-        for group_id in shared_groups.split(","):
-            if group_id:
-                image_shares.insert(image_id=id, user_group_id=int(group_id))
+    with db.conn:
+        images.update(image)
+        shares_changed = sync_shares(
+            db, "image_share", "image_id", id, parse_group_ids(shared_groups)
+        )
+    listing = shares_changed or previous_category != validated_category
+    for category in {previous_category, validated_category}:
+        publish(CategoryChanged(category, listing=listing))
 
     return get_image_edit_form(id, htmx, request, auth)
 
@@ -641,6 +729,7 @@ async def update_thumbnail(
             image_data, image.id, content_type, is_thumbnail=True
         )
         images.update(image)
+        publish(CategoryChanged(image.category))
 
         thumbnail_url = storage.generate_signed_url(
             image.thumbnail_path, cache_bust=True
@@ -672,7 +761,8 @@ def delete_image(id: int, htmx, request, auth, session):
         storage.delete_image(image.full_image_path)
 
     images.delete(id)
-    return get_image_gallery(htmx, request, session)
+    publish(CategoryChanged(image.category, listing=True))
+    return get_image_gallery(htmx, request, auth)
 
 
 # ============================================================================
@@ -710,9 +800,84 @@ async def post_image_upload_form(
     except ValueError as e:
         return P(f"Category error: {e}", style="color: red;")
 
+    prepared_images = [await prepare_uploaded_image(image) for image in uploaded_images]
     images_to_insert = []
 
-    for image in uploaded_images:
+    with db.conn:
+        for image_data, content_type, thumbnail_data in prepared_images:
+            img = images.insert(
+                owner_id=owner_id,
+                name=f"Image_{uuid.uuid4().hex[:8]}",
+                image_data=b"",
+                thumbnail_data=b"",
+                created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+                content_type="",
+                category=validated_category,
+                thumbnail_path="",
+                full_image_path="",
+            )
+
+            store_image_files(img, image_data, content_type, thumbnail_data)
+            images.update(img)
+
+            images_to_insert.append(img)
+
+        insert_shares(
+            db,
+            "image_share",
+            "image_id",
+            [img.id for img in images_to_insert],
+            parse_group_ids(shared_groups),
+        )
+    publish(CategoryChanged(validated_category, listing=True))
+
+    return get_image_cards(images_to_insert, owner_id)
+
+
+# ============================================================================
+# FEATURE: BATCH UPLOAD
+# ============================================================================
+
+BATCH_UPLOAD_CONCURRENCY = 4
+BATCH_JOB_TTL_SECONDS = 3600
+
+
+@dataclass
+class UploadJob:
+    owner_id: str
+    total: int
+    created_at: float
+    events: asyncio.Queue
+    task: asyncio.Task | None = None
+    done: int = 0
+    failed: int = 0
+
+
+_upload_jobs: dict[str, UploadJob] = {}
+
+
+def _expire_upload_jobs() -> None:
+    cutoff = time.monotonic() - BATCH_JOB_TTL_SECONDS
+    for job_id in [jid for jid, job in _upload_jobs.items() if job.created_at < cutoff]:
+        _upload_jobs.pop(job_id, None)
+
+
+def _prepare_image_bytes(
+    image_data: bytes, content_type: str, filename: str
+) -> tuple[bytes, str, bytes]:
+    validate_image_data(image_data, content_type, filename)
+    return image_data, content_type, process_image(image_data)
+
+
+def _store_batch_image(
+    owner_id: str,
+    category: str,
+    group_ids: set[int],
+    image_data: bytes,
+    content_type: str,
+    thumbnail_data: bytes,
+) -> DBImage:
+    with db.conn:
         img = images.insert(
             owner_id=owner_id,
             name=f"Image_{uuid.uuid4().hex[:8]}",
@@ -720,23 +885,111 @@ async def post_image_upload_form(
             thumbnail_data=b"",
             created_at=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             content_type="",
-            category=validated_category,
+            category=category,
             thumbnail_path="",
             full_image_path="",
         )
-
-        await save_uploaded_image(img, image)
+        store_image_files(img, image_data, content_type, thumbnail_data)
         images.update(img)
+        insert_shares(db, "image_share", "image_id", [img.id], group_ids)
+    publish(CategoryChanged(category, listing=True))
+    return img
 
-        images_to_insert.append(img)
 
-    if shared_groups:
-        for img in images_to_insert:
-            for group_id in shared_groups.split(","):
-                if group_id:
-                    image_shares.insert(image_id=img.id, user_group_id=int(group_id))
+async def _run_batch_upload(
+    job_id: str,
+    files: list[tuple[str, str, bytes]],
+    category: str,
+    group_ids: set[int],
+) -> None:
+    job = _upload_jobs[job_id]
+    semaphore = asyncio.Semaphore(BATCH_UPLOAD_CONCURRENCY)
+
+    async def process(filename: str, content_type: str, image_data: bytes) -> None:
+        async with semaphore:
+            try:
+                # Validation and thumbnailing are CPU bound, so they run off the
+                # event loop; the DB writes stay on it to keep transactions serial.
+                prepared = await asyncio.to_thread(
+                    _prepare_image_bytes, image_data, content_type, filename
+                )
+                img = _store_batch_image(job.owner_id, category, group_ids, *prepared)
+            except Exception as e:
+                logger.warning(f"Batch upload {job_id}: failed {filename}: {e}")
+                job.failed += 1
+                await job.events.put(
+                    sse_message(Small(f"{filename}: {e}", cls="error-text"), "failure")
+                )
+            else:
+                job.done += 1
+                await job.events.put(
+                    sse_message(get_image_cards([img], job.owner_id)[0], "card")
+                )
+            await job.events.put(
+                sse_message(
+                    BatchUploadStatus(job_id, job.total, job.done, job.failed),
+                    "progress",
+                )
+            )
 
-    return get_image_cards(images_to_insert, owner_id)
+    await asyncio.gather(*[process(*file) for file in files])
+    logger.info(
+        f"Batch upload {job_id} finished: {job.done} uploaded, {job.failed} failed"
+    )
+    await job.events.put(sse_message(Div(), "done"))
+    await job.events.put(None)
+
+
+@ar_images.post("/batch")
+async def post_batch_upload(
+    uploaded_images: list[UploadFile],
+    auth,
+    category: str = "",
+    shared_groups: str | None = None,
+):
+    from .category_utils import validate_and_get_category
+
+    try:
+        validated_category = validate_and_get_category(category or "unclassified")
+    except ValueError as e:
+        return P(f"Category error: {e}", style="color: red;")
+
+    # Upload files are closed once this request ends, so read them up front.
+    files = [
+        (image.filename or "", image.content_type or "", await image.read())
+        for image in uploaded_images
+    ]
+
+    _expire_upload_jobs()
+    job_id = uuid.uuid4().hex
+    job = UploadJob(
+        owner_id=auth,
+        total=len(files),
+        created_at=time.monotonic(),
+        events=asyncio.Queue(),
+    )
+    _upload_jobs[job_id] = job
+    job.task = asyncio.create_task(
+        _run_batch_upload(
+            job_id, files, validated_category, parse_group_ids(shared_groups)
+        )
+    )
+
+    return BatchUploadStream(job_id, job.total)
+
+
+@ar_images.get("/batch/{job_id}/events")
+async def batch_upload_events(job_id: str, auth):
+    job = _upload_jobs.get(job_id)
+    if not job or job.owner_id != auth:
+        return Response("Not found", status_code=404)
+
+    async def stream():
+        while (message := await job.events.get()) is not None:
+            yield message
+        _upload_jobs.pop(job_id, None)
+
+    return EventStream(stream())
 
 
 # ============================================================================
@@ -744,28 +997,57 @@ async def post_image_upload_form(
 # ============================================================================
 
 
+GALLERY_PAGE_SIZE = 48
+
+
 @ar_images.get("/list", name="View Gallery")
-def get_image_gallery(htmx, request, auth, category: str = "", mine_only: str = ""):
+def get_image_gallery(
+    htmx, request, auth, category: str = "", mine_only: str = "", cursor: str = ""
+):
     from .category_utils import get_all_categories
 
     user_id = auth
     is_admin = request.scope.get("is_admin", False)
 
-    accessible_images = get_accessible_images(user_id, is_admin)
-    categories = get_all_categories()
+    etag = versioned_etag(
+        request, *list_page_keys(category if category != "All" else None)
+    )
+    if (unchanged := not_modified(request, etag)) is not None:
+        return unchanged
 
-    if category and category != "All":
-        filtered_images = [img for img in accessible_images if img.category == category]
-    else:
-        filtered_images = accessible_images
+    page_cursor = decode_cursor(cursor)
+    filtered_images, next_cursor = split_page(
+        get_accessible_images(
+            user_id,
+            is_admin,
+            category=category if category != "All" else None,
+            owner_id=user_id if mine_only == "true" else None,
+            cursor=page_cursor,
+            limit=GALLERY_PAGE_SIZE,
+        ),
+        GALLERY_PAGE_SIZE,
+    )
+    next_url = (
+        page_url(
+            f"{ar_images.prefix}/list",
+            category=category,
+            mine_only=mine_only,
+            cursor=next_cursor,
+        )
+        if next_cursor
+        else None
+    )
 
-    if mine_only == "true":
-        filtered_images = [img for img in filtered_images if img.owner_id == user_id]
+    if page_cursor:
+        return with_etag(
+            (*get_image_cards(filtered_images, user_id), LoadMore(next_url)), etag
+        )
 
+    categories = get_all_categories()
     content = ImageGalleryPage(
-        filtered_images, user_id, categories, category, mine_only == "true"
+        filtered_images, user_id, categories, category, mine_only == "true", next_url
     )
-    return get_full_layout(content, htmx, is_admin)
+    return with_etag(get_full_layout(content, htmx, is_admin), etag)
 
 
 @ar_images.get("/categories")
@@ -1,13 +1,43 @@
 from fasthtml.common import *  # type: ignore
 from .base_layout import get_full_layout, tag
-from .images_router import DBImage, get_category_images, get_accessible_images
-from .tierlist_router import tierlist_to_ratings, get_category_tierlists
-from .users_router import get_user_avatar, get_anonymous_avatar, get_shared_group_users
+from .pagination import page_url, LoadMore
+from .conditional import not_modified, versioned_etag, with_etag
+from .images_router import DBImage, get_category_images
+from .tierlist_router import get_category_tierlists, get_tierlist_names
+from .users_router import (
+    get_user_avatar,
+    get_user_avatars,
+    get_anonymous_avatar,
+    get_shared_group_users,
+)
 from services.storage import get_storage_service
+from services.fragment_cache import cached_fragment, get_data_version
+from services.data_versions import category_key, get_category_version
+from services.invalidation import CategoryChanged, publish
+from services.tierlist_codec import decode_tierlist_arrays
+from services.similarity import SimilarityIndex
+from services.masked_nmf import ObservedRatings, masked_nmf
+from services.nmf_selection import select_n_components
+from services.model_store import (
+    StoredModel,
+    create_category_model_index,
+    latest_n_components,
+    load_category_model,
+    ratings_fingerprint,
+    relabel_category_model,
+    save_category_model,
+)
+from services.taste_index import get_taste_index, user_taste_vectors
+from services.write_debounce import KeyedDebouncer
 from components.hot_takes import HotTakes
 from components.popular_images import PopularImages
+from components.similar_users import SimilarUsers
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 import numpy as np
 import os
+import threading
 import logging
 
 logger = logging.getLogger(__name__)
@@ -27,6 +57,28 @@ DEFAULT_AVATAR = "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' w
 db = database(os.environ.get("DB_PATH", "app/database.db"))
 
 
+@dataclass
+class CategoryModel:
+    id: int
+    category: str
+    source_version: int
+    data_version: str
+    n_components: int
+    n_tierlists: int
+    n_images: int
+    W: bytes
+    H: bytes
+    tierlist_ids: bytes
+    owner_ids: str
+    image_ids: bytes
+    observed: bytes
+    fitted_at: str
+
+
+category_models = db.create(CategoryModel, pk="id", transform=True)
+create_category_model_index(db)
+
+
 # ============================================================================
 # ROUTER SETUP
 # ============================================================================
@@ -42,45 +94,51 @@ ar_latent.show = True  # type: ignore
 
 
 def build_ratings_matrix(
-    category: str, user_id: str, is_admin: bool
-) -> Tuple[np.ndarray | None, list[tuple[str, str, bool]] | None, list[DBImage] | None]:
-    category_images = get_category_images(category, user_id, is_admin)
+    category: str,
+) -> Tuple[ObservedRatings | None, list[int] | None, list[str] | None, list[DBImage] | None]:
+    """Observed (tierlist, image) ratings of a whole category; unrated cells are absent.
+
+    Returns the matrix, the tierlist and owner id of each row and the image
+    of each column, or Nones when fewer than two tierlists rate anything.
+    """
+    category_images = get_category_images(category, None, True)
     if not category_images:
-        return None, None, None
+        return None, None, None, None
 
-    category_tierlists = get_category_tierlists(category, user_id, is_admin)
+    category_tierlists = get_category_tierlists(category, None, True)
     if not category_tierlists:
-        return None, None, None
+        return None, None, None, None
 
-    image_ids = [img.id for img in category_images]
-    image_id_to_idx = {img_id: idx for idx, img_id in enumerate(image_ids)}
+    image_ids = np.array([img.id for img in category_images], dtype=np.int64)
+    column_order = np.argsort(image_ids)
+    sorted_ids = image_ids[column_order]
 
-    shared_users = get_shared_group_users(user_id)
-    tierlist_labels = []
-    ratings_list = []
+    tierlist_ids, owner_ids = [], []
+    row_cols, row_values = [], []
 
     for tierlist in category_tierlists:
-        ratings_dict = tierlist_to_ratings(tierlist.data)
-        rating_vector = [0] * len(image_ids)
-
-        has_ratings = False
-        for img_id, rating in ratings_dict.items():
-            if img_id in image_id_to_idx:
-                rating_vector[image_id_to_idx[img_id]] = rating
-                has_ratings = True
-
-        if has_ratings:
-            shares_group = (
-                tierlist.owner_id in shared_users or tierlist.owner_id == user_id
-            )
-            tierlist_labels.append((tierlist.owner_id, tierlist.name, shares_group))
-            ratings_list.append(rating_vector)
-
-    if len(ratings_list) < 2:
-        return None, None, None
-
-    ratings_matrix = np.array(ratings_list)
-    return ratings_matrix, tierlist_labels, category_images
+        rated_ids, ratings = decode_tierlist_arrays(tierlist.data)
+        positions = np.minimum(np.searchsorted(sorted_ids, rated_ids), len(sorted_ids) - 1)
+        known = sorted_ids[positions] == rated_ids
+
+        if known.any():
+            # An image placed twice keeps one rating, like the dense matrix did.
+            cols, first = np.unique(column_order[positions[known]], return_index=True)
+            tierlist_ids.append(tierlist.id)
+            owner_ids.append(tierlist.owner_id)
+            row_cols.append(cols)
+            row_values.append(ratings[known][first])
+
+    if len(row_cols) < 2:
+        return None, None, None, None
+
+    ratings_matrix = ObservedRatings(
+        rows=np.repeat(np.arange(len(row_cols)), [len(cols) for cols in row_cols]),
+        cols=np.concatenate(row_cols),
+        values=np.concatenate(row_values).astype(np.float64),
+        shape=(len(row_cols), len(image_ids)),
+    )
+    return ratings_matrix, tierlist_ids, owner_ids, category_images
 
 
 # ============================================================================
@@ -88,26 +146,237 @@ def build_ratings_matrix(
 # ============================================================================
 
 
-def perform_nmf(ratings_matrix, n_components=3):
-    from sklearn.decomposition import NMF
-
+def perform_nmf(ratings_matrix: ObservedRatings, n_components=3):
     n_users, n_images = ratings_matrix.shape
     n_components = min(n_components, n_users, n_images)
 
-    model = NMF(n_components=n_components, random_state=42, max_iter=500)  # type: ignore
-    W = model.fit_transform(ratings_matrix)
-    H = model.components_
+    W, H, error = masked_nmf(ratings_matrix, n_components)
+    return W, H.T, error
+
+
+# "auto" picks the rank per category; a number pins it.
+NMF_COMPONENTS = os.environ.get("NMF_COMPONENTS", "auto")
+DEFAULT_N_COMPONENTS = 3
 
-    return W, H.T, model
 
+def _pinned_rank(shape: tuple[int, int]) -> int | None:
+    if NMF_COMPONENTS == "auto":
+        return None
+    return min(int(NMF_COMPONENTS), *shape)
+
+
+def initial_n_components(category: str, shape: tuple[int, int]) -> int:
+    """Rank to serve a new fit at before the background sweep has run."""
+    pinned = _pinned_rank(shape)
+    if pinned is not None:
+        return pinned
+    return min(latest_n_components(db, category) or DEFAULT_N_COMPONENTS, *shape)
+
+
+@dataclass
+class CategoryFit:
+    """Factorization of a whole category at one data version."""
+
+    version: int
+    n_components: int
+    W: np.ndarray  # tierlists × components
+    H: np.ndarray  # images × components
+    tierlist_ids: np.ndarray
+    owner_ids: list[str]
+    image_ids: np.ndarray
+    rows: np.ndarray  # observed cells
+    cols: np.ndarray
+
+
+# category -> (data version, fit or None without enough data)
+_fits: dict[str, tuple[int, CategoryFit | None]] = {}
+# One lock per category, so a slow fit only holds up its own category.
+_fit_locks: dict[str, threading.Lock] = {}
+_fit_locks_lock = threading.Lock()
+
+# Single-threaded background queues, by name: "model-store" writes fits so
+# requests never wait on them, "taste-refresh" runs debounced refits.
+_workers: dict[str, ThreadPoolExecutor] = {}
+_workers_lock = threading.Lock()
+
+
+def _get_worker(name: str) -> ThreadPoolExecutor:
+    with _workers_lock:
+        if name not in _workers:
+            _workers[name] = ThreadPoolExecutor(max_workers=1, thread_name_prefix=name)
+        return _workers[name]
+
+
+def shutdown_analysis_workers() -> None:
+    """Drop queued taste refits; let pending model store writes finish."""
+    with _workers_lock:
+        workers = dict(_workers)
+        _workers.clear()
+    if "taste-refresh" in workers:
+        workers["taste-refresh"].shutdown(wait=False, cancel_futures=True)
+    if "model-store" in workers:
+        workers["model-store"].shutdown(wait=True)
+
+
+def get_category_fit(category: str) -> CategoryFit | None:
+    """The full (admin) factorization of `category` at its current data version.
+
+    Every viewer's analysis is a slice of this one fit, so the number of
+    themes is the same for everyone and each data version is fitted once
+    across all instances.
+    """
+    version = get_category_version(category)
+    with _fit_locks_lock:
+        lock = _fit_locks.setdefault(category, threading.Lock())
+    with lock:
+        cached = _fits.get(category)
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        fit = _load_or_fit(category, version)
+        _fits[category] = (version, fit)
+        return fit
+
+
+def _fit_from_stored(version: int, stored: StoredModel) -> CategoryFit:
+    return CategoryFit(
+        version=version,
+        n_components=stored.n_components,
+        W=stored.W,
+        H=stored.H,
+        tierlist_ids=stored.tierlist_ids,
+        owner_ids=stored.owner_ids,
+        image_ids=stored.image_ids,
+        rows=stored.rows,
+        cols=stored.cols,
+    )
 
-def calculate_similarities(W_normalized):
-    from sklearn.metrics.pairwise import cosine_similarity
 
-    return (
-        cosine_similarity(W_normalized)
-        if W_normalized.shape[0] > 1
-        else np.array([[1.0]])
+def _usable(stored: StoredModel | None) -> bool:
+    pinned = _pinned_rank(stored.W.shape) if stored is not None else None
+    return stored is not None and pinned in (None, stored.n_components)
+
+
+def _in_background(task, *args) -> None:
+    def run():
+        try:
+            task(*args)
+        except Exception:
+            logger.exception(f"Background {task.__name__} failed")
+
+    _get_worker("model-store").submit(run)
+
+
+# category -> number of fresh fits so far; only the newest one's sweep runs.
+_rank_sweeps: dict[str, int] = {}
+_rank_sweeps_lock = threading.Lock()
+
+
+def _schedule_rank_sweep(category: str, *fit_inputs) -> None:
+    with _rank_sweeps_lock:
+        sweep = _rank_sweeps[category] = _rank_sweeps.get(category, 0) + 1
+    _in_background(_sweep_rank, category, sweep, *fit_inputs)
+
+
+def _sweep_rank(
+    category: str,
+    sweep: int,
+    version: int,
+    fingerprint: str,
+    served_rank: int,
+    ratings_matrix: ObservedRatings,
+    tierlist_ids: list[int],
+    owner_ids: list[str],
+    image_ids: list[int],
+) -> None:
+    """Select the rank for a fit served at `served_rank` and store the winner.
+
+    Runs on the model-store worker without any category lock. A newer fresh
+    fit of the category supersedes it, since that one queues its own sweep.
+    """
+    with _rank_sweeps_lock:
+        if _rank_sweeps.get(category) != sweep:
+            return
+    chosen = select_n_components(ratings_matrix, DEFAULT_N_COMPONENTS).n_components
+    if chosen == served_rank:
+        return
+
+    W, H, _ = perform_nmf(ratings_matrix, chosen)
+    save_category_model(
+        db,
+        category,
+        version,
+        fingerprint,
+        W,
+        H,
+        ratings_matrix,
+        tierlist_ids,
+        owner_ids,
+        image_ids,
+    )
+    # The ratings are unchanged, so the next load finds this model by its
+    # fingerprint; the event moves caches and ETags past the served fit.
+    publish(CategoryChanged(category))
+    schedule_taste_refresh(category)
+
+
+def _load_or_fit(category: str, version: int) -> CategoryFit | None:
+    """Load this version's fit from the model store, or fit and store it."""
+    stored = load_category_model(db, category, source_version=version)
+    if _usable(stored):
+        return _fit_from_stored(version, stored)
+
+    ratings_matrix, tierlist_ids, owner_ids, images = build_ratings_matrix(category)
+    if ratings_matrix is None:
+        return None
+    image_ids = [img.id for img in images]
+
+    # Writes that don't touch placements (a renamed image, a new share) bump
+    # the version without changing the ratings; reuse the fit of the same ratings.
+    fingerprint = ratings_fingerprint(ratings_matrix, image_ids, tierlist_ids)
+    stored = load_category_model(db, category, data_version=fingerprint)
+    if _usable(stored):
+        _in_background(relabel_category_model, db, stored.id, version)
+        return _fit_from_stored(version, stored)
+
+    # One fit at a known rank now; choosing the rank takes several fits, so
+    # that happens on the model-store worker.
+    n_components = initial_n_components(category, ratings_matrix.shape)
+    W, H, _ = perform_nmf(ratings_matrix, n_components)
+    _in_background(
+        save_category_model,
+        db,
+        category,
+        version,
+        fingerprint,
+        W,
+        H,
+        ratings_matrix,
+        tierlist_ids,
+        owner_ids,
+        image_ids,
+    )
+    if _pinned_rank(ratings_matrix.shape) is None:
+        _schedule_rank_sweep(
+            category,
+            version,
+            fingerprint,
+            W.shape[1],
+            ratings_matrix,
+            tierlist_ids,
+            owner_ids,
+            image_ids,
+        )
+    # Same precision as a later load, so a restart doesn't shift any scores.
+    return CategoryFit(
+        version=version,
+        n_components=W.shape[1],
+        W=W.astype(np.float32),
+        H=H.astype(np.float32),
+        tierlist_ids=np.asarray(tierlist_ids, dtype=np.int64),
+        owner_ids=owner_ids,
+        image_ids=np.asarray(image_ids, dtype=np.int64),
+        rows=ratings_matrix.rows,
+        cols=ratings_matrix.cols,
     )
 
 
@@ -121,14 +390,155 @@ def get_top_images_per_theme(H, images, n_components, top_n=8):
     ]
 
 
-def find_similar_tierlists(current_user_indices, similarities, display_labels, top_n=3):
+def find_similar_tierlists(
+    current_user_indices, similarity_index: SimilarityIndex, display_labels, top_n=3
+):
     return [
-        (display_labels[sim_idx], int(similarities[user_idx, sim_idx] * 100))
-        for user_idx in current_user_indices
-        for sim_idx in np.argsort(similarities[user_idx])[::-1][1 : top_n + 1]
-        if sim_idx != user_idx
+        (display_labels[sim_idx], int(similarity * 100))
+        for matches in similarity_index.top_k(current_user_indices, top_n)
+        for sim_idx, similarity in matches
+    ]
+
+
+ANALYSIS_CACHE_MAX_ENTRIES = 32
+
+
+@dataclass
+class CategoryAnalysis:
+    tierlist_labels: list[tuple[str, str, bool]]
+    images: list[DBImage]
+    n_components: int
+    W_normalized: np.ndarray
+    H: np.ndarray
+    similarity_index: SimilarityIndex
+
+
+_analyses: OrderedDict[tuple, CategoryAnalysis | None] = OrderedDict()
+_analysis_locks: dict[tuple, threading.Lock] = {}
+_analyses_lock = threading.Lock()
+
+
+def _analyze_category(
+    category: str, user_id: str, is_admin: bool
+) -> CategoryAnalysis | None:
+    """Slice the viewer's images (columns of H) and the tierlists that rated
+    any of them (rows of W) out of the category's full fit."""
+    fit = get_category_fit(category)
+    if fit is None:
+        if is_admin:
+            get_taste_index().update_category(category, {})
+        return None
+
+    column_of = {image_id: j for j, image_id in enumerate(fit.image_ids.tolist())}
+    images = [
+        img
+        for img in get_category_images(category, user_id, is_admin)
+        if img.id in column_of
+    ]
+    if not images:
+        return None
+    columns = np.array([column_of[img.id] for img in images])
+    visible = np.zeros(len(fit.image_ids), dtype=bool)
+    visible[columns] = True
+    rows = np.unique(fit.rows[visible[fit.cols]])
+    if len(rows) < 2:
+        return None
+
+    tierlist_ids = fit.tierlist_ids[rows].tolist()
+    owner_ids = [fit.owner_ids[row] for row in rows]
+    names = get_tierlist_names(tierlist_ids)
+    shared_users = get_shared_group_users(user_id)
+    tierlist_labels = [
+        (
+            owner_id,
+            names.get(tierlist_id, ""),
+            owner_id in shared_users or owner_id == user_id,
+        )
+        for tierlist_id, owner_id in zip(tierlist_ids, owner_ids)
     ]
 
+    W = fit.W[rows]
+    W_normalized = W / W.sum(axis=1, keepdims=True)
+    if is_admin:
+        # Admins see every tierlist, so this run can feed the taste index.
+        get_taste_index().update_category(
+            category, user_taste_vectors(owner_ids, W_normalized)
+        )
+    return CategoryAnalysis(
+        tierlist_labels=tierlist_labels,
+        images=images,
+        n_components=fit.n_components,
+        W_normalized=W_normalized,
+        H=fit.H[columns],
+        similarity_index=SimilarityIndex(W_normalized),
+    )
+
+
+def get_category_analysis(
+    category: str, user_id: str, is_admin: bool
+) -> CategoryAnalysis | None:
+    """Factorization of a category as `user_id` sees it, or None without enough data.
+
+    Insights sections load in parallel; the first one to ask computes the
+    analysis while the others wait for it instead of repeating the work.
+    """
+    key = (
+        category,
+        user_id,
+        is_admin,
+        get_data_version("global"),
+        get_data_version("category", category),
+    )
+    with _analyses_lock:
+        if key in _analyses:
+            _analyses.move_to_end(key)
+            return _analyses[key]
+        lock = _analysis_locks.setdefault(key, threading.Lock())
+
+    with lock:
+        with _analyses_lock:
+            if key in _analyses:
+                return _analyses[key]
+        analysis = _analyze_category(category, user_id, is_admin)
+        with _analyses_lock:
+            _analyses[key] = analysis
+            _analysis_locks.pop(key, None)
+            while len(_analyses) > ANALYSIS_CACHE_MAX_ENTRIES:
+                _analyses.popitem(last=False)
+    return analysis
+
+
+TASTE_REFRESH_DELAY_SECONDS = 30
+TASTE_REFRESH_MAX_WAIT_SECONDS = 300
+
+
+def _refresh_taste_vectors(category: str) -> None:
+    try:
+        _analyze_category(category, None, True)
+    except Exception:
+        logger.exception(f"Taste refresh for {category!r} failed")
+
+
+_taste_refreshes = KeyedDebouncer(
+    # One refit at a time, off the request threads and the debouncer's timers.
+    lambda category, _pending: _get_worker("taste-refresh").submit(
+        _refresh_taste_vectors, category
+    ),
+    TASTE_REFRESH_DELAY_SECONDS,
+    TASTE_REFRESH_MAX_WAIT_SECONDS,
+)
+
+
+def schedule_taste_refresh(*categories: str) -> None:
+    """Refactor `categories` for the taste index once writes to them settle.
+
+    Called by the process that wrote tierlist placements, the only input of
+    the factorization, or that stored a fit at a newly selected rank; ratings
+    and comments don't schedule anything.
+    """
+    for category in categories:
+        _taste_refreshes.update(category, lambda pending: None)
+
 
 def get_display_label(owner_id, tierlist_name, share_group):
     if share_group:
@@ -180,11 +590,10 @@ def TasteProfileCard(
     )
 
 
-def ImageLatentCard(image, latent_scores, n_components, user_id):
-    from .users_router import get_user_avatar
+def ImageLatentCard(image, latent_scores, n_components, user_id, owner=None):
     from components.image_card import ImageCard
 
-    username, avatar_url = get_user_avatar(image.owner_id)
+    username, avatar_url = owner or get_user_avatar(image.owner_id)
 
     metadata = Div(
         Img(src=avatar_url, alt="avatar", cls="avatar small"),
@@ -295,6 +704,17 @@ def YourProfilesSection(
     )
 
 
+def PeopleLikeYouSection(user_id, is_admin):
+    similar_users = SimilarUsers(user_id, user_id, is_admin)
+    if similar_users is None:
+        return None
+    return Div(
+        H3("People Like You"),
+        P("Closest tastes across every category you've ranked:"),
+        similar_users,
+    )
+
+
 def AllProfilesSection(W_normalized, tierlist_labels, n_components):
     return Article(
         Details(
@@ -319,6 +739,17 @@ def AllProfilesSection(W_normalized, tierlist_labels, n_components):
     )
 
 
+def LazySection(url: str, title: str) -> Any:
+    """Placeholder that swaps itself for the section at `url` once the page loads."""
+    return Article(
+        Header(H2(title)),
+        aria_busy="true",
+        hx_get=url,
+        hx_trigger="load",
+        hx_swap="outerHTML",
+    )
+
+
 def InsufficientDataPage(category, htmx, is_admin):
     return get_full_layout(
         Div(
@@ -415,32 +846,14 @@ def select_category(htmx, request, session):
 
 @ar_latent.get("/analyze")
 def analyze_category(category: str, htmx, request, session):
-    user_id = session.get("user_id")
+    """Page skeleton; every section loads from its own endpoint."""
     is_admin = request.scope.get("is_admin", False)
+    etag = versioned_etag(request, category_key(category))
+    if (unchanged := not_modified(request, etag)) is not None:
+        return unchanged
 
-    ratings_matrix, tierlist_labels, images = build_ratings_matrix(
-        category, user_id, is_admin
-    )
-    if ratings_matrix is None or tierlist_labels is None or images is None:
-        return InsufficientDataPage(category, htmx, is_admin)
-
-    n_components = min(3, ratings_matrix.shape[0], ratings_matrix.shape[1])
-    W, H, _ = perform_nmf(ratings_matrix, n_components)
-    W_normalized = W / W.sum(axis=1, keepdims=True)
-
-    display_labels = [get_display_label(*label) for label in tierlist_labels]
-    similarities = calculate_similarities(W_normalized)
-
-    current_user_indices = [
-        i for i, (owner_id, _, _) in enumerate(tierlist_labels) if owner_id == user_id
-    ]
-    similar_tierlists = find_similar_tierlists(
-        current_user_indices, similarities, display_labels
-    )
-    top_images_per_theme = get_top_images_per_theme(H, images, n_components)
-
-    images_map = {img.id: img for img in get_accessible_images(user_id, is_admin)}
-    popular_images = PopularImages(category, images_map, limit=8)
+    def section_url(section: str) -> str:
+        return page_url(f"{ar_latent.prefix}/analyze/{section}", category=category)
 
     content = Div(
         Header(
@@ -455,8 +868,45 @@ def analyze_category(category: str, htmx, request, session):
             ),
             cls="flex-row",
         ),
+        LazySection(section_url("profiles"), "Your Taste Profile"),
+        LazySection(section_url("hot-takes"), "Hot Takes"),
+        LazySection(section_url("popular"), "Popular Images"),
+        LazySection(section_url("themes"), "The Themes"),
+    )
+
+    return with_etag(get_full_layout(content, htmx, is_admin), etag)
+
+
+@ar_latent.get("/analyze/profiles")
+def analyze_profiles_section(category: str, request, session):
+    user_id = session.get("user_id")
+    is_admin = request.scope.get("is_admin", False)
+
+    analysis = get_category_analysis(category, user_id, is_admin)
+    if analysis is None:
+        return P(
+            "Not enough data to perform analysis. Need at least 2 tierlists with ratings in this category."
+        )
+
+    tierlist_labels = analysis.tierlist_labels
+    W_normalized = analysis.W_normalized
+    n_components = analysis.n_components
+
+    # Resolve every profile owner in one query; the label and avatar helpers
+    # below then read from the warm cache.
+    get_user_avatars(owner_id for owner_id, _, _ in tierlist_labels)
+    display_labels = [get_display_label(*label) for label in tierlist_labels]
+
+    current_user_indices = [
+        i for i, (owner_id, _, _) in enumerate(tierlist_labels) if owner_id == user_id
+    ]
+    similar_tierlists = find_similar_tierlists(
+        current_user_indices, analysis.similarity_index, display_labels
+    )
+
+    return Div(
         P(
-            f"Analyzed {len(tierlist_labels)} tierlists with {len(images)} images across {n_components} themes."
+            f"Analyzed {len(tierlist_labels)} tierlists with {len(analysis.images)} images across {n_components} themes."
         ),
         YourProfilesSection(
             current_user_indices,
@@ -465,57 +915,140 @@ def analyze_category(category: str, htmx, request, session):
             n_components,
             similar_tierlists,
         ),
-        AllProfilesSection(W_normalized, tierlist_labels, n_components),
-        HotTakes(user_id, category, images_map, limit=8),
-        *(popular_images if popular_images else []),
-        Article(
-            Details(
-                Summary(Header(H2("The Themes"))),
-                P("These are the underlying styles that explain different preferences:"),
-                *ThemeImages(top_images_per_theme, n_components, category),
-            )
+        PeopleLikeYouSection(user_id, is_admin),
+        cached_fragment(
+            "AllProfilesSection",
+            (category, user_id, is_admin),
+            lambda: AllProfilesSection(W_normalized, tierlist_labels, n_components),
+            categories=[category],
         ),
     )
 
-    return get_full_layout(content, htmx, is_admin)
 
+def _category_images_map(category: str, user_id: str, is_admin: bool) -> dict:
+    return {img.id: img for img in get_category_images(category, user_id, is_admin)}
 
-@ar_latent.get("/gallery")
-def image_latent_gallery(category: str, theme: int, htmx, request, session):
+
+@ar_latent.get("/analyze/hot-takes")
+def analyze_hot_takes_section(category: str, request, session):
     user_id = session.get("user_id")
     is_admin = request.scope.get("is_admin", False)
 
-    ratings_matrix, _, images = build_ratings_matrix(category, user_id, is_admin)
-    if ratings_matrix is None or images is None:
-        return InsufficientDataPage(category, htmx, is_admin)
+    return cached_fragment(
+        "HotTakes",
+        (category, user_id, is_admin, 8),
+        lambda: HotTakes(
+            user_id, category, _category_images_map(category, user_id, is_admin), limit=8
+        ),
+        categories=[category],
+    ) or Div()
 
-    n_components = min(3, ratings_matrix.shape[0], ratings_matrix.shape[1])
-    if theme < 0 or theme >= n_components:
-        return get_full_layout(
-            Div(
-                H1("Invalid Theme"),
-                P(f"Theme must be between 0 and {n_components - 1}."),
-                A(
-                    "Back to insights",
-                    href=f"{ar_latent.prefix}/analyze?category={category}",
-                    hx_boost="true",
-                    hx_target="#main",
-                    role="button",
+
+@ar_latent.get("/analyze/popular")
+def analyze_popular_section(category: str, request, session):
+    user_id = session.get("user_id")
+    is_admin = request.scope.get("is_admin", False)
+
+    return cached_fragment(
+        "PopularImages",
+        (category, user_id, is_admin, 8),
+        lambda: PopularImages(
+            category, _category_images_map(category, user_id, is_admin), limit=8
+        ),
+        categories=[category],
+    ) or Div()
+
+
+@ar_latent.get("/analyze/themes")
+def analyze_themes_section(category: str, request, session):
+    user_id = session.get("user_id")
+    is_admin = request.scope.get("is_admin", False)
+
+    analysis = get_category_analysis(category, user_id, is_admin)
+    if analysis is None:
+        return Div()
+
+    return Article(
+        Details(
+            Summary(Header(H2("The Themes"))),
+            P("These are the underlying styles that explain different preferences:"),
+            cached_fragment(
+                "ThemeImages",
+                (category, user_id, is_admin),
+                lambda: ThemeImages(
+                    get_top_images_per_theme(
+                        analysis.H, analysis.images, analysis.n_components
+                    ),
+                    analysis.n_components,
+                    category,
                 ),
+                categories=[category],
             ),
-            htmx,
-            is_admin,
         )
+    )
+
+
+LATENT_GALLERY_PAGE_SIZE = 24
+
+
+@ar_latent.get("/gallery")
+def image_latent_gallery(
+    category: str, theme: int, htmx, request, session, page: int = 0
+):
+    user_id = session.get("user_id")
+    is_admin = request.scope.get("is_admin", False)
+    # Checked before the analysis so a revalidation never loads the model.
+    etag = versioned_etag(request, category_key(category))
+    if (unchanged := not_modified(request, etag)) is not None:
+        return unchanged
 
-    _, H, _ = perform_nmf(ratings_matrix, n_components)
-    H_normalized = H / H.max(axis=0, keepdims=True)
+    analysis = get_category_analysis(category, user_id, is_admin)
+    if analysis is None:
+        return with_etag(InsufficientDataPage(category, htmx, is_admin), etag)
 
-    image_index = {id(img): i for i, img in enumerate(images)}
-    sorted_images = sorted(
-        [(img, H_normalized[i, theme]) for i, img in enumerate(images)],
-        key=lambda x: x[1],
-        reverse=True,
+    images = analysis.images
+    n_components = analysis.n_components
+    if theme < 0 or theme >= n_components:
+        invalid = Div(
+            H1("Invalid Theme"),
+            P(f"Theme must be between 0 and {n_components - 1}."),
+            A(
+                "Back to insights",
+                href=f"{ar_latent.prefix}/analyze?category={category}",
+                hx_boost="true",
+                hx_target="#main",
+                role="button",
+            ),
+        )
+        return with_etag(get_full_layout(invalid, htmx, is_admin), etag)
+
+    H_normalized = analysis.H / analysis.H.max(axis=0, keepdims=True)
+
+    # Scores come from the factorization rather than a column, so pages are
+    # slices of the score ordering instead of a keyset query.
+    order = np.argsort(-H_normalized[:, theme], kind="stable")
+    start = max(page, 0) * LATENT_GALLERY_PAGE_SIZE
+    page_indices = order[start : start + LATENT_GALLERY_PAGE_SIZE]
+    next_url = (
+        page_url(
+            f"{ar_latent.prefix}/gallery",
+            category=category,
+            theme=theme,
+            page=max(page, 0) + 1,
+        )
+        if start + LATENT_GALLERY_PAGE_SIZE < len(images)
+        else None
     )
+    avatars = get_user_avatars(images[i].owner_id for i in page_indices)
+    cards = [
+        ImageLatentCard(
+            images[i], H_normalized[i], n_components, user_id, avatars[images[i].owner_id]
+        )
+        for i in page_indices
+    ]
+
+    if page > 0:
+        return with_etag((*cards, LoadMore(next_url)), etag)
 
     content = Div(
         Header(
@@ -530,19 +1063,15 @@ def image_latent_gallery(category: str, theme: int, htmx, request, session):
             ),
             cls="flex-row",
         ),
-        P(f"Images sorted by Theme {theme + 1} strength ({len(sorted_images)} total)"),
+        P(f"Images sorted by Theme {theme + 1} strength ({len(images)} total)"),
         Grid(
-            *[
-                ImageLatentCard(
-                    img, H_normalized[image_index[id(img)]], n_components, user_id
-                )
-                for img, _ in sorted_images
-            ],
+            *cards,
+            LoadMore(next_url),
             cls="flex-wrap",
         ),
     )
 
-    return get_full_layout(content, htmx, is_admin)
+    return with_etag(get_full_layout(content, htmx, is_admin), etag)
 
 
 # ============================================================================
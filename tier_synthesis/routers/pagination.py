@@ -0,0 +1,53 @@
+from fasthtml.common import *  # type: ignore
+from urllib.parse import urlencode
+
+
+def encode_cursor(created_at: str, item_id: int) -> str:
+    """Encode the (created_at, id) of the last row on a page as a cursor."""
+    return f"{created_at}|{item_id}"
+
+
+def decode_cursor(cursor: str | None) -> tuple[str, int] | None:
+    if not cursor or "|" not in cursor:
+        return None
+    created_at, _, item_id = cursor.rpartition("|")
+    try:
+        return created_at, int(item_id)
+    except ValueError:
+        return None
+
+
+def keyset_condition(alias: str, cursor: tuple[str, int]) -> tuple[str, list]:
+    """SQL condition selecting rows after `cursor` in (created_at, id) DESC order."""
+    created_at, item_id = cursor
+    return (
+        f"({alias}.created_at < ? OR ({alias}.created_at = ? AND {alias}.id < ?))",
+        [created_at, created_at, item_id],
+    )
+
+
+def split_page(rows: list, limit: int | None) -> tuple[list, str | None]:
+    """Trim a `limit + 1` fetch to one page and return the cursor for the next."""
+    if limit is None or len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    return page, encode_cursor(page[-1].created_at, page[-1].id)
+
+
+def page_url(path: str, **params) -> str:
+    return f"{path}?{urlencode({k: v for k, v in params.items() if v not in (None, '')})}"
+
+
+def LoadMore(url: str | None, **kwargs) -> Any:
+    """Sentinel that swaps itself for the next page once scrolled into view."""
+    if not url:
+        return None
+    return Div(
+        aria_busy="true",
+        hx_get=url,
+        hx_trigger="revealed",
+        hx_target="this",
+        hx_swap="outerHTML",
+        cls="load-more",
+        **kwargs,
+    )
@@ -8,9 +8,12 @@ from .tierlist_router import (
     enrich_tierlists_with_ratings,
 )
 from .images_router import get_accessible_images
-from components.hot_takes import DivergentImage, _calculate_divergence
+from components.hot_takes import DivergentImage
+from components.similar_users import SimilarUsers
+from services.divergence import find_divergences
+from services.image_stats import get_category_baseline
+from services.tierlist_codec import decode_tierlist
 import os
-import json
 import logging
 from collections import Counter
 
@@ -48,8 +51,7 @@ def get_user_stats(user_id: str) -> dict:
     tierlists = db.q("SELECT data FROM db_tierlist WHERE owner_id = ?", [user_id])
     unique_images = set()
     for tl in tierlists:
-        data = json.loads(tl["data"]) if isinstance(tl["data"], str) else tl["data"]
-        for _, img_list in data.items():
+        for img_list in decode_tierlist(tl["data"]).values():
             unique_images.update(img_list)
     rated_images = len(unique_images)
 
@@ -94,15 +96,23 @@ def get_user_stats(user_id: str) -> dict:
 
 def find_contrarian_opinions(user_id: str) -> list[dict]:
     """Find opinions where user differs most from the crowd across all categories."""
-    categories = db.q(
-        "SELECT DISTINCT category FROM db_tierlist WHERE category IS NOT NULL"
+    # Only the user's own tierlists are decoded; crowd averages come from the
+    # stored per-category aggregates.
+    tierlists = db.q(
+        """
+        SELECT owner_id, category, data FROM db_tierlist
+        WHERE owner_id = ? AND category IS NOT NULL
+        ORDER BY id
+        """,
+        [user_id],
     )
+    baseline = get_category_baseline(db, sorted({tl["category"] for tl in tierlists}))
 
     all_divergences = []
-    for cat_row in categories:
-        category = cat_row["category"]
-        divergences = _calculate_divergence(user_id, category)
-        for div in divergences[:3]:  # Top 3 per category
+    for category, divergences in find_divergences(
+        tierlists, user_id, limit_per_category=3, baseline=baseline
+    ).items():
+        for div in divergences:
             div["category"] = category
             all_divergences.append(div)
 
@@ -262,6 +272,7 @@ def ProfilePage(
     images_map = {img.id: img for img in all_images}
 
     taste_summary = get_taste_profile_summary(profile_user_id)
+    similar_users = SimilarUsers(profile_user_id, viewer_id, is_admin)
 
     tier_distribution = Counter()
     for tl in user_tierlists:
@@ -350,6 +361,15 @@ def ProfilePage(
             if contrarian
             else None
         ),
+        # Nearest neighbours in the cross-category taste index
+        (
+            Div(
+                H3("🤝 People With Similar Taste"),
+                similar_users,
+            )
+            if similar_users
+            else None
+        ),
         # Recent tierlists
         Div(
             H3("Recent Tierlists"),
@@ -0,0 +1,51 @@
+from typing import Any
+
+
+def parse_group_ids(shared_groups: str | None) -> set[int]:
+    """Parse the comma-separated group id list posted by the share checkboxes."""
+    if not shared_groups:
+        return set()
+    return {int(group_id) for group_id in shared_groups.split(",") if group_id}
+
+
+def sync_shares(
+    db: Any, table: str, column: str, item_id: int, group_ids: set[int]
+) -> bool:
+    """Diff an item's share rows against `group_ids`, touching only what changed.
+
+    Meant to run inside the caller's transaction (`with db.conn:`). Returns
+    whether any share was added or removed.
+    """
+    current = {
+        row["user_group_id"]
+        for row in db.q(
+            f"SELECT user_group_id FROM {table} WHERE {column} = ?", [item_id]
+        )
+    }
+
+    to_delete = current - group_ids
+    to_insert = group_ids - current
+
+    if to_delete:
+        db.conn.executemany(
+            f"DELETE FROM {table} WHERE {column} = ? AND user_group_id = ?",
+            [(item_id, group_id) for group_id in to_delete],
+        )
+    if to_insert:
+        db.conn.executemany(
+            f"INSERT INTO {table} ({column}, user_group_id) VALUES (?, ?)",
+            [(item_id, group_id) for group_id in to_insert],
+        )
+    return bool(to_delete or to_insert)
+
+
+def insert_shares(
+    db: Any, table: str, column: str, item_ids: list[int], group_ids: set[int]
+) -> None:
+    """Bulk insert share rows for freshly created items."""
+    if not item_ids or not group_ids:
+        return
+    db.conn.executemany(
+        f"INSERT INTO {table} ({column}, user_group_id) VALUES (?, ?)",
+        [(item_id, group_id) for item_id in item_ids for group_id in group_ids],
+    )
@@ -1,12 +1,28 @@
 from fasthtml.common import *  # type: ignore
 from .base_layout import get_full_layout, list_item, tag
+from .share_utils import parse_group_ids, sync_shares
+from .pagination import decode_cursor, keyset_condition, split_page, page_url, LoadMore
+from .conditional import not_modified, versioned_etag, with_etag
+from services.fragment_cache import cached_fragment
+from services.invalidation import (
+    CategoryChanged,
+    TierlistStatsChanged,
+    UserRatingChanged,
+    publish,
+    subscribe,
+)
+from services.data_versions import list_page_keys
+from services.tierlist_codec import TIER_TO_RATING, decode_tierlist, encode_tierlist
+from services.image_stats import apply_rating_stats_delta, create_image_rating_stats_index
+from services.write_debounce import KeyedDebouncer
+from services.pubsub import get_event_bus
 from components.modal import Modal, modal_open_handler, ModalCloseButton
-from dataclasses import dataclass
+from dataclasses import dataclass, replace
 from datetime import datetime
-from functools import lru_cache
-from typing import Any
+from typing import Any, Iterable
 import os
 import json
+import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
@@ -15,25 +31,12 @@ logger = logging.getLogger(__name__)
 # SHARED UTILITIES
 # ============================================================================
 
-TIER_TO_RATING = {
-    "S": 5,
-    "A": 4,
-    "B": 3,
-    "C": 2,
-    "D": 1,
-}
-
-
-def tierlist_to_ratings(tierlist_data: dict | str) -> dict:
+def tierlist_to_ratings(tierlist_data: dict | str | bytes) -> dict:
     """Convert tierlist data to image ID -> rating mapping."""
-    data = (
-        json.loads(tierlist_data) if isinstance(tierlist_data, str) else tierlist_data
-    )
     ratings = {}
-    for tier, image_ids in data.items():
-        if tier in TIER_TO_RATING:
-            for img_id in image_ids:
-                ratings[int(img_id)] = TIER_TO_RATING[tier]
+    for tier, image_ids in decode_tierlist(tierlist_data).items():
+        for img_id in image_ids:
+            ratings[img_id] = TIER_TO_RATING[tier]
     return ratings
 
 
@@ -50,35 +53,48 @@ class DBTierlist:
     owner_id: str
     category: str
     name: str
-    data: str
+    data: bytes
     created_at: str
+    version: int = 0
+    # Denormalized from tierlist_rating / tierlist_comment, kept in step by
+    # the rating and comment write paths (see migrations.repair_tierlist_counters).
+    love_count: int = 0
+    tomato_count: int = 0
+    comment_count: int = 0
+
+    def get_tier_index(self) -> dict[int, tuple[str, int]]:
+        """Map each placed image id to its (tier, position) in the saved data."""
+        data = decode_tierlist(self.data)
+        index = {}
+        for tier in self.TIERS:
+            for position, img_id in enumerate(data[tier]):
+                index.setdefault(img_id, (tier, position))
+        return index
 
     def get_tier_structure(
         self, images: list[Any]
     ) -> tuple[dict[str, list[Any]], list[Any]]:
-        data = json.loads(self.data)
-        result = {tier: [] for tier in self.TIERS}
+        index = self.get_tier_index()
+        tier_sizes = dict.fromkeys(self.TIERS, 0)
+        for tier, position in index.values():
+            tier_sizes[tier] = max(tier_sizes[tier], position + 1)
+        slots = {tier: [None] * tier_sizes[tier] for tier in self.TIERS}
         leftover_images = []
 
         for image in images:
-            for tier, image_ids in data.items():
-                if str(image.id) in image_ids:
-                    result[tier].append(image)
-                    break
+            placement = index.get(image.id)
+            if placement:
+                tier, position = placement
+                slots[tier][position] = image
             else:
                 leftover_images.append(image)
 
+        result = {
+            tier: [image for image in slots[tier] if image is not None]
+            for tier in self.TIERS
+        }
         return result, leftover_images
 
-    def get_tierlist_data_js(self) -> str:
-        return """Object.fromEntries(
-            Array.from(document.querySelectorAll('[data-tier]')).map(tier => [
-                tier.dataset.tier,
-                Array.from(tier.querySelectorAll('div'))
-                    .map(div => div.dataset.imageId)
-            ])
-        )"""
-
 
 @dataclass
 class TierlistShare:
@@ -104,6 +120,27 @@ class TierlistComment:
     created_at: str
 
 
+@dataclass
+class TierlistAutosave:
+    """Autosaved edits not yet folded into the tierlist, one row per tierlist."""
+
+    tierlist_id: int
+    category: str
+    base_version: int
+    version: int
+    data: bytes
+    updated_at: str
+
+
+@dataclass
+class ImageRatingStats:
+    category: str
+    image_id: int
+    sum: int
+    sum_sq: int
+    count: int
+
+
 # ============================================================================
 # DATABASE SETUP
 # ============================================================================
@@ -133,6 +170,18 @@ tierlist_comments = db.create(
     foreign_keys=(("tierlist_id", "db_tierlist"), ("user_id", "user")),
     transform=True,
 )
+tierlist_autosaves = db.create(
+    TierlistAutosave,
+    pk="tierlist_id",
+    foreign_keys=(("tierlist_id", "db_tierlist"),),
+    transform=True,
+)
+image_rating_stats = db.create(
+    ImageRatingStats,
+    pk=("category", "image_id"),
+    transform=True,
+)
+create_image_rating_stats_index(db)
 
 
 # ============================================================================
@@ -141,118 +190,298 @@ tierlist_comments = db.create(
 
 
 def get_accessible_tierlists(
-    user_id: str, is_admin: bool, fetch_all: bool = False
+    user_id: str,
+    is_admin: bool,
+    fetch_all: bool = False,
+    category: str | None = None,
+    owner_id: str | None = None,
+    cursor: tuple[str, int] | None = None,
+    limit: int | None = None,
 ) -> list[DBTierlist]:
-    if is_admin or fetch_all:
-        result = db.q("SELECT * FROM db_tierlist ORDER BY created_at DESC")
+    """Tierlists visible to the user, newest first, optionally one keyset page.
+
+    With `limit`, one extra row is fetched so `split_page` can tell whether
+    another page follows.
+    """
+    conditions, params = [], []
+    if not (is_admin or fetch_all):
+        conditions.append(
+            """(t.owner_id = ? OR EXISTS (
+                SELECT 1 FROM tierlist_share s
+                JOIN user_group_membership m ON s.user_group_id = m.group_id
+                WHERE s.tierlist_id = t.id AND m.user_id = ?
+            ))"""
+        )
+        params += [user_id, user_id]
+    if category:
+        conditions.append("t.category = ?")
+        params.append(category)
+    if owner_id:
+        conditions.append("t.owner_id = ?")
+        params.append(owner_id)
+    if cursor:
+        condition, cursor_params = keyset_condition("t", cursor)
+        conditions.append(condition)
+        params += cursor_params
+
+    where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+    limit_clause = f"LIMIT {int(limit) + 1}" if limit is not None else ""
+    result = db.q(
+        f"""
+        SELECT t.* FROM db_tierlist t
+        {where}
+        ORDER BY t.created_at DESC, t.id DESC
+        {limit_clause}
+        """,
+        params,
+    )
+    return [DBTierlist(**row) for row in result]
+
+
+def can_view_tierlist(tierlist: DBTierlist, user_id: str, is_admin: bool) -> bool:
+    """One-tierlist access check: owner, admin, or a member of a shared group."""
+    if is_admin or tierlist.owner_id == user_id:
+        return True
+    return bool(
+        db.q(
+            """
+            SELECT 1 FROM tierlist_share s
+            JOIN user_group_membership m ON s.user_group_id = m.group_id
+            WHERE s.tierlist_id = ? AND m.user_id = ?
+            LIMIT 1
+            """,
+            [tierlist.id, user_id],
+        )
+    )
+
+
+def get_accessible_tierlist_categories(user_id: str, is_admin: bool) -> list[str]:
+    if is_admin:
+        result = db.q(
+            "SELECT DISTINCT category FROM db_tierlist WHERE category IS NOT NULL AND category != ''"
+        )
     else:
         result = db.q(
             """
-            SELECT DISTINCT db_tierlist.*
-            FROM db_tierlist
-            LEFT JOIN tierlist_share ON db_tierlist.id = tierlist_share.tierlist_id
-            LEFT JOIN user_group_membership ON tierlist_share.user_group_id = user_group_membership.group_id
-            WHERE db_tierlist.owner_id = ?
-               OR user_group_membership.user_id = ?
-            ORDER BY db_tierlist.created_at DESC
+            SELECT DISTINCT t.category FROM db_tierlist t
+            WHERE t.category IS NOT NULL AND t.category != ''
+              AND (t.owner_id = ? OR EXISTS (
+                SELECT 1 FROM tierlist_share s
+                JOIN user_group_membership m ON s.user_group_id = m.group_id
+                WHERE s.tierlist_id = t.id AND m.user_id = ?
+              ))
             """,
             [user_id, user_id],
         )
-    return [DBTierlist(**row) for row in result]
+    return sorted(row["category"] for row in result)
+
+
+def get_tierlist_names(tierlist_ids: list[int]) -> dict[int, str]:
+    """Names of the given tierlists, without loading their data."""
+    if not tierlist_ids:
+        return {}
+    placeholders = ",".join("?" * len(tierlist_ids))
+    rows = db.q(
+        f"SELECT id, name FROM db_tierlist WHERE id IN ({placeholders})", tierlist_ids
+    )
+    return {row["id"]: row["name"] for row in rows}
 
 
 def get_category_tierlists(category, user_id, is_admin):
-    tierlists = get_accessible_tierlists(user_id, is_admin, fetch_all=True)
-    return [tl for tl in tierlists if tl.category == category]
+    return get_accessible_tierlists(user_id, is_admin, fetch_all=True, category=category)
+
+
+USER_RATING_CACHE_MAX_ENTRIES = 4096
+
+# (tierlist id, user id) -> rating row, or None for "hasn't rated"
+_user_rating_cache: dict[tuple[int, str], TierlistRating | None] = {}
+
+
+def _cache_user_ratings(entries: dict[tuple[int, str], TierlistRating | None]) -> None:
+    if len(_user_rating_cache) + len(entries) > USER_RATING_CACHE_MAX_ENTRIES:
+        _user_rating_cache.clear()
+    _user_rating_cache.update(entries)
 
 
-@lru_cache(maxsize=256)
 def get_user_rating(tierlist_id: int, user_id: str) -> TierlistRating | None:
-    return next(
-        iter(
-            tierlist_ratings("tierlist_id = ? and user_id = ?", (tierlist_id, user_id))
-        ),
-        None,
-    )
+    key = (tierlist_id, user_id)
+    if key not in _user_rating_cache:
+        rating = next(
+            iter(
+                tierlist_ratings(
+                    "tierlist_id = ? and user_id = ?", (tierlist_id, user_id)
+                )
+            ),
+            None,
+        )
+        _cache_user_ratings({key: rating})
+    return _user_rating_cache[key]
+
+
+def load_user_ratings(
+    tierlist_id: int, user_ids: Iterable[str]
+) -> dict[str, TierlistRating | None]:
+    """Ratings of many users on one tierlist, fetching cache misses in one query."""
+    result = {}
+    missing = []
+    for user_id in set(user_ids):
+        key = (tierlist_id, user_id)
+        if key in _user_rating_cache:
+            result[user_id] = _user_rating_cache[key]
+        else:
+            missing.append(user_id)
+
+    if missing:
+        placeholders = ",".join("?" * len(missing))
+        found = {
+            row["user_id"]: TierlistRating(**row)
+            for row in db.q(
+                f"""
+                SELECT * FROM tierlist_rating
+                WHERE tierlist_id = ? AND user_id IN ({placeholders})
+                """,
+                [tierlist_id, *missing],
+            )
+        }
+        for user_id in missing:
+            result[user_id] = found.get(user_id)
+        _cache_user_ratings(
+            {(tierlist_id, user_id): result[user_id] for user_id in missing}
+        )
+
+    return result
+
+
+def invalidate_user_rating(tierlist_id: int, user_id: str) -> None:
+    _user_rating_cache.pop((tierlist_id, user_id), None)
+
+
+subscribe(
+    UserRatingChanged,
+    lambda event: invalidate_user_rating(event.tierlist_id, event.user_id),
+)
+
+
+def apply_tier_moves(
+    data: dict[str, list[int]], moves: list
+) -> dict[str, list[int]] | None:
+    """Replay editor moves on decoded tierlist data.
+
+    Each move is `(image_id, from_tier, to_tier, before_id)`, with `None` as
+    the tier for the unplaced pool. The image lands right before `before_id`,
+    or at the end of the tier when that is `None`; anchoring on a neighbour
+    keeps stored images the editor didn't render (deleted, or not shared with
+    the viewer) in place. Returns None when a move doesn't match the current
+    placements, meaning the client edited a stale copy.
+    """
+    data = {tier: list(data.get(tier, [])) for tier in DBTierlist.TIERS}
+
+    for move in moves:
+        if not isinstance(move, (list, tuple)) or len(move) != 4:
+            raise ValueError(f"Malformed move: {move!r}")
+        image_id, from_tier, to_tier, before_id = move
+        image_id = int(image_id)
+        before_id = int(before_id) if before_id is not None else None
+        if from_tier not in data and from_tier is not None:
+            raise ValueError(f"Unknown tier: {from_tier!r}")
+        if to_tier not in data and to_tier is not None:
+            raise ValueError(f"Unknown tier: {to_tier!r}")
+
+        if from_tier is None:
+            if any(image_id in ids for ids in data.values()):
+                return None
+        elif image_id in data[from_tier]:
+            data[from_tier].remove(image_id)
+        else:
+            return None
+
+        if to_tier is not None:
+            if before_id is None:
+                data[to_tier].append(image_id)
+            elif before_id in data[to_tier]:
+                data[to_tier].insert(data[to_tier].index(before_id), image_id)
+            else:
+                return None
 
+    return data
 
-def get_tierlist_metadata(
-    tierlist_ids: list[int], user_id: str | None = None
-) -> dict[int, dict[str, Any]]:
+
+def write_tierlist_data(
+    tierlist_id: int, data: dict, expected_version: int | None = None
+) -> int | None:
+    """Store tier placements and bump the tierlist version.
+
+    With `expected_version`, the write only happens if nobody saved in the
+    meantime; returns the new version, or None when the check fails.
+    The category's image rating aggregates move along in the same transaction.
+    """
+    encoded = encode_tierlist(data)
+    with db.conn:
+        previous = db.q(
+            "SELECT category, data FROM db_tierlist WHERE id = ?", [tierlist_id]
+        )
+        if expected_version is None:
+            db.conn.execute(
+                "UPDATE db_tierlist SET data = ?, version = COALESCE(version, 0) + 1 WHERE id = ?",
+                (encoded, tierlist_id),
+            )
+        else:
+            db.conn.execute(
+                """
+                UPDATE db_tierlist SET data = ?, version = COALESCE(version, 0) + 1
+                WHERE id = ? AND COALESCE(version, 0) = ?
+                """,
+                (encoded, tierlist_id, expected_version),
+            )
+        if not db.conn.changes():
+            return None
+        apply_rating_stats_delta(
+            db, previous[0]["category"], previous[0]["data"], encoded
+        )
+        return db.q("SELECT version FROM db_tierlist WHERE id = ?", [tierlist_id])[0][
+            "version"
+        ]
+
+
+def schedule_taste_refresh(category: str) -> None:
+    """Refit `category` for the taste index after its placements changed."""
+    from .latent_router import schedule_taste_refresh
+
+    schedule_taste_refresh(category)
+
+
+def get_user_ratings(tierlist_ids: list[int], user_id: str) -> dict[int, int]:
+    """The user's rating for each of `tierlist_ids` they have rated."""
     if not tierlist_ids:
         return {}
-
     placeholders = ",".join("?" * len(tierlist_ids))
-
-    rating_result = db.q(
+    rows = db.q(
         f"""
-        SELECT
-            tierlist_id,
-            SUM(CASE WHEN rating = 1 THEN 1 ELSE 0 END) as love_count,
-            SUM(CASE WHEN rating = -1 THEN 1 ELSE 0 END) as tomato_count
+        SELECT tierlist_id, rating
         FROM tierlist_rating
-        WHERE tierlist_id IN ({placeholders})
-        GROUP BY tierlist_id
+        WHERE tierlist_id IN ({placeholders}) AND user_id = ?
         """,
-        tierlist_ids,
+        [*tierlist_ids, user_id],
     )
-
-    comment_result = db.q(
-        f"""
-        SELECT tierlist_id, COUNT(*) as count
-        FROM tierlist_comment
-        WHERE tierlist_id IN ({placeholders})
-        GROUP BY tierlist_id
-        """,
-        tierlist_ids,
-    )
-
-    result = {
-        tid: {
-            "love_count": 0,
-            "tomato_count": 0,
-            "user_rating": None,
-            "comment_count": 0,
-        }
-        for tid in tierlist_ids
-    }
-
-    for row in rating_result:
-        result[row["tierlist_id"]]["love_count"] = row["love_count"] or 0
-        result[row["tierlist_id"]]["tomato_count"] = row["tomato_count"] or 0
-
-    for row in comment_result:
-        result[row["tierlist_id"]]["comment_count"] = row["count"]
-
-    if user_id:
-        user_rating_result = db.q(
-            f"""
-            SELECT tierlist_id, rating
-            FROM tierlist_rating
-            WHERE tierlist_id IN ({placeholders}) AND user_id = ?
-            """,
-            [*tierlist_ids, user_id],
-        )
-        for row in user_rating_result:
-            result[row["tierlist_id"]]["user_rating"] = row["rating"]
-
-    return result
+    return {row["tierlist_id"]: row["rating"] for row in rows}
 
 
 def enrich_tierlists_with_ratings(
     tierlist_list: list[DBTierlist], user_id: str | None = None
 ) -> list[DBTierlist]:
+    """Attach the viewer's rating; counts already come with the tierlist row."""
     if not tierlist_list:
         return tierlist_list
 
-    metadata = get_tierlist_metadata([tl.id for tl in tierlist_list], user_id)
+    user_ratings = (
+        get_user_ratings([tl.id for tl in tierlist_list], user_id) if user_id else {}
+    )
 
     for tierlist in tierlist_list:
-        data = metadata[tierlist.id]
-        tierlist.love_count = data["love_count"]  # type: ignore
-        tierlist.tomato_count = data["tomato_count"]  # type: ignore
-        tierlist.user_rating = data["user_rating"]  # type: ignore
-        tierlist.comment_count = data["comment_count"]  # type: ignore
+        tierlist.love_count = tierlist.love_count or 0
+        tierlist.tomato_count = tierlist.tomato_count or 0
+        tierlist.comment_count = tierlist.comment_count or 0
+        tierlist.user_rating = user_ratings.get(tierlist.id)  # type: ignore
 
     return tierlist_list
 
@@ -296,12 +525,23 @@ def make_container(element: Any, can_edit: bool) -> Any:
             "@drop": """
                     $event.preventDefault();
                     const target = $event.target.closest('article');
-                    if (dragging && target) {
-                        target.parentNode.insertBefore(dragging, target);
-                        hasUnsavedChanges = true;
-                    } else if (dragging) {
-                        $event.currentTarget.insertBefore(dragging, $event.currentTarget.firstChild);
-                        hasUnsavedChanges = true;
+                    if (dragging) {
+                        const fromTier = dragging.parentNode.dataset.tier || null;
+                        if (target) {
+                            target.parentNode.insertBefore(dragging, target);
+                        } else {
+                            $event.currentTarget.insertBefore(dragging, $event.currentTarget.firstChild);
+                        }
+                        // Anchor on the next image rather than an index: the stored
+                        // tier may hold images this viewer doesn't see.
+                        let next = dragging.nextElementSibling;
+                        while (next && !next.dataset.imageId) next = next.nextElementSibling;
+                        recordMove([
+                            Number(dragging.dataset.imageId),
+                            fromTier,
+                            dragging.parentNode.dataset.tier || null,
+                            next ? Number(next.dataset.imageId) : null,
+                        ]);
                     }
              """
             if can_edit
@@ -359,23 +599,24 @@ def SaveForm(
                     placeholder="My Tierlist",
                     id="tierlist-name-input",
                     readonly=not can_edit,
-                    _at_input="hasUnsavedChanges = true" if can_edit else None,
+                    _at_input="formChanged = true" if can_edit else None,
                 ),
+                TierlistVersion(tierlist.version or 0),
                 Button(
                     "Save",
-                    hx_post=f"{ar_tierlist.prefix}/id/{tierlist.id}",
-                    hx_vals=f"""js:{{
-                        tierlist_data: {tierlist.get_tierlist_data_js()},
+                    hx_post=f"{ar_tierlist.prefix}/id/{tierlist.id}/moves",
+                    hx_vals="""js:{
+                        moves: JSON.stringify(Alpine.$data(document.getElementById('tierlist-save-btn')).moves),
+                        version: document.getElementById('tierlist-version').value,
                         name: document.getElementById('tierlist-name-input').value,
                         shared_groups: Array.from(document.querySelectorAll('input[name="shared_groups"]:checked')).map(cb => cb.value).join(',')
-                    }}""",
-                    hx_target="#main",
-                    hx_push_url="true",
+                    }""",
+                    hx_swap="none",
                     cls="primary",
                     id="tierlist-save-btn",
                     disabled=not can_edit,
                     x_bind__aria_busy="saving" if can_edit else None,
-                    _at_htmx__before_request="saving = true; hasUnsavedChanges = false"
+                    _at_htmx__before_request="saving = true; sentMoves = moves.length; formChanged = false"
                     if can_edit
                     else None,
                     _at_htmx__after_request="saving = false" if can_edit else None,  # type: ignore
@@ -383,6 +624,7 @@ def SaveForm(
                 cls="flex-row",
             ),
         ),
+        AutosaveControls(tierlist) if can_edit else None,
         (
             Label(
                 "Share with groups",
@@ -393,7 +635,7 @@ def SaveForm(
                         checked=group["id"] in shared_group_ids,
                         disabled=not can_edit,
                         label=group["groupname"],
-                        _at_input="hasUnsavedChanges = true" if can_edit else None,
+                        _at_input="formChanged = true" if can_edit else None,
                     )
                     for group in user_groups
                 ],
@@ -404,6 +646,55 @@ def SaveForm(
     )
 
 
+def TierlistVersion(version: int) -> Any:
+    """Version the editor's pending moves are based on, refreshed by every save."""
+    return Input(type="hidden", id="tierlist-version", value=str(version))
+
+
+def AutosaveStatus(message: str = "") -> Any:
+    return Small(message, id="autosave-status")
+
+
+def AutosaveControls(tierlist: DBTierlist) -> Any:
+    """Autosave switch plus the hidden element the editor triggers to flush moves."""
+    return Div(
+        Label(
+            Input(type="checkbox", role="switch", x_model="autosave"),
+            "Autosave",
+        ),
+        AutosaveStatus(),
+        Span(
+            id="tierlist-autosave",
+            hx_post=f"{ar_tierlist.prefix}/id/{tierlist.id}/autosave",
+            hx_trigger="autosave",
+            hx_vals="""js:{
+                moves: JSON.stringify(Alpine.$data(document.getElementById('tierlist-autosave')).moves),
+                version: document.getElementById('tierlist-version').value
+            }""",
+            hx_swap="none",
+            _at_htmx__before_request="saving = true; sentMoves = moves.length",
+            _at_htmx__after_request="saving = false",  # type: ignore
+        ),
+        cls="flex-row",
+    )
+
+
+def SaveToast(message: str, ok: bool = True, action: Any = None) -> Any:
+    return Div(
+        Ins(message) if ok else Del(message),
+        action,
+        Script("""
+            setTimeout(() => {
+                const toast = document.getElementById('toast');
+                if (toast) toast.classList.remove('show');
+            }, 3000);
+        """),
+        id="toast",
+        cls="show",
+        hx_swap_oob="true",
+    )
+
+
 def TierlistPage(
     tierlist: DBTierlist,
     images: list[Any],
@@ -414,8 +705,7 @@ def TierlistPage(
 ) -> Any:
     from components.user_display import UserDisplay
 
-    filtered_images = [img for img in images if img.category == tierlist.category]
-    tier_structure, leftover_images = tierlist.get_tier_structure(filtered_images)
+    tier_structure, leftover_images = tierlist.get_tier_structure(images)
 
     return Div(
         Header(
@@ -458,7 +748,7 @@ def TierlistPage(
                 const getData = () => Alpine.$data(container);
 
                 document.body.addEventListener('htmx:beforeRequest', function(e) {
-                    if (e.detail.elt && e.detail.elt.id === 'tierlist-save-btn') return;
+                    if (e.detail.elt && ['tierlist-save-btn', 'tierlist-autosave'].includes(e.detail.elt.id)) return;
 
                     const data = getData();
                     if (data && data.hasUnsavedChanges) {
@@ -477,7 +767,38 @@ def TierlistPage(
                 });
             })();
         """),
-        x_data="{ dragging: null, saving: false, hasUnsavedChanges: false }",
+        x_data="""{
+            dragging: null,
+            saving: false,
+            formChanged: false,
+            moves: [],
+            sentMoves: 0,
+            autosave: localStorage.getItem('tierlistAutosave') === '1',
+            get hasUnsavedChanges() { return this.formChanged || this.moves.length > 0 },
+            recordMove(move) {
+                const last = this.moves[this.moves.length - 1];
+                if (this.moves.length > this.sentMoves && last && last[0] === move[0]) {
+                    // Consecutive drags of one image collapse into a single move.
+                    last[2] = move[2];
+                    last[3] = move[3];
+                } else {
+                    this.moves.push(move);
+                }
+            },
+        }""",
+        x_init=f"""
+            $watch('autosave', value => localStorage.setItem('tierlistAutosave', value ? '1' : '0'));
+            const timer = setInterval(() => {{
+                if (!$el.isConnected) return clearInterval(timer);
+                if (autosave && !saving && moves.length > 0) htmx.trigger('#tierlist-autosave', 'autosave');
+            }}, {AUTOSAVE_CLIENT_FLUSH_MS});
+        """
+        if can_edit
+        else None,
+        **{
+            "@tierlist-saved": "moves.splice(0, sentMoves); sentMoves = 0",
+            "@tierlist-conflict": "sentMoves = 0; autosave = false",
+        },
     )
 
 
@@ -487,8 +808,11 @@ def TierlistList(
     categories: list[str] | None = None,
     selected_category: str = "",
     mine_only: bool = False,
+    next_url: str | None = None,
 ) -> Any:
-    from .users_router import get_user_avatar
+    from .users_router import get_user_avatars
+
+    avatars = get_user_avatars(tl.owner_id for tl in tierlist_list)
 
     return Div(
         Header(
@@ -534,45 +858,58 @@ def TierlistList(
             ),
             style="display: flex; gap: 1rem; align-items: center; margin-bottom: 1rem;",
         ),
-        *[
-            list_item(
+        *(
+            [
+                TierlistListItem(tierlist, user_id, avatars[tierlist.owner_id])
+                for tierlist in tierlist_list
+            ]
+            + [LoadMore(next_url), LiveRatings()]
+        )
+        if tierlist_list
+        else [P("No tierlists yet. Create one to get started!")],
+    )
+
+
+def TierlistListItem(
+    tierlist: DBTierlist, user_id: str, owner: tuple[str, str] | None = None
+) -> Any:
+    from .users_router import get_user_avatar
+
+    username, avatar_url = owner or get_user_avatar(tierlist.owner_id)
+
+    return list_item(
+        Div(
+            A(
                 Div(
-                    A(
-                        Div(
-                            Img(
-                                src=get_user_avatar(tierlist.owner_id)[1],
-                                alt="avatar",
-                                cls="avatar small",
-                            ),
-                            Small(get_user_avatar(tierlist.owner_id)[0]),
-                            cls="user-info",
-                        ),
-                        Strong(tierlist.name),
-                        f" - {tierlist.created_at[:10]}",
-                        Br(),
-                        tag(tierlist.category),
-                        tag("Owned" if tierlist.owner_id == user_id else "Shared"),
-                        href=f"{ar_tierlist.prefix}/id/{tierlist.id}",
-                        hx_boost="true",
-                        hx_target="#main",
+                    Img(
+                        src=avatar_url,
+                        alt="avatar",
+                        cls="avatar small",
                     ),
-                    rating_display(tierlist),
+                    Small(username),
+                    cls="user-info",
                 ),
-                Button(
-                    "Delete",
-                    hx_delete=f"{ar_tierlist.prefix}/id/{tierlist.id}",
-                    hx_confirm="Delete this tierlist?",
-                    hx_target="#main",
-                    hx_push_url="true",
-                    cls="secondary outline",
-                )
-                if tierlist.owner_id == user_id
-                else None,
-            )
-            for tierlist in tierlist_list
-        ]
-        if tierlist_list
-        else P("No tierlists yet. Create one to get started!"),
+                Strong(tierlist.name),
+                f" - {tierlist.created_at[:10]}",
+                Br(),
+                tag(tierlist.category),
+                tag("Owned" if tierlist.owner_id == user_id else "Shared"),
+                href=f"{ar_tierlist.prefix}/id/{tierlist.id}",
+                hx_boost="true",
+                hx_target="#main",
+            ),
+            rating_display(tierlist),
+        ),
+        Button(
+            "Delete",
+            hx_delete=f"{ar_tierlist.prefix}/id/{tierlist.id}",
+            hx_confirm="Delete this tierlist?",
+            hx_target="#main",
+            hx_push_url="true",
+            cls="secondary outline",
+        )
+        if tierlist.owner_id == user_id
+        else None,
     )
 
 
@@ -626,9 +963,14 @@ def post_new_tierlist(name: str, category: str, htmx, auth, req) -> Any:
         owner_id=owner_id,
         category=validated_category,
         name=name,
-        data=json.dumps({tier: [] for tier in DBTierlist.TIERS}),
+        data=encode_tierlist({}),
         created_at=datetime.now().isoformat(),
+        version=0,
+        love_count=0,
+        tomato_count=0,
+        comment_count=0,
     )
+    publish(CategoryChanged(validated_category, listing=True))
 
     return get_tierlist_editor(tierlist.id, htmx, req)
 
@@ -636,8 +978,9 @@ def post_new_tierlist(name: str, category: str, htmx, auth, req) -> Any:
 @ar_tierlist.get("/id/{id}")
 def get_tierlist_editor(id: int, htmx, req) -> Any:
     from .images_router import get_accessible_images
+    from .users_router import get_user_groups
 
-    logger.info(tierlists)
+    flush_autosave(id)
     tierlist = tierlists[id]
     is_admin = req.scope.get("is_admin", False)
     user_id = req.scope["auth"]
@@ -655,15 +998,7 @@ def get_tierlist_editor(id: int, htmx, req) -> Any:
 
     can_edit = tierlist.owner_id == user_id or is_admin
 
-    user_groups = db.q(
-        """
-        SELECT user_group.*
-        FROM user_group
-        JOIN user_group_membership ON user_group.id = user_group_membership.group_id
-        WHERE user_group_membership.user_id = ?
-        """,
-        [user_id],
-    )
+    user_groups = get_user_groups(user_id)
 
     shared_group_ids = [
         row["user_group_id"]
@@ -672,7 +1007,7 @@ def get_tierlist_editor(id: int, htmx, req) -> Any:
         )
     ]
 
-    images_query = get_accessible_images(user_id, is_admin)
+    images_query = get_accessible_images(user_id, is_admin, category=tierlist.category)
     content = TierlistPage(
         tierlist, images_query, can_edit, user_groups, shared_group_ids, user_id
     )
@@ -680,20 +1015,44 @@ def get_tierlist_editor(id: int, htmx, req) -> Any:
     return get_full_layout(content, htmx, is_admin)
 
 
-@ar_tierlist.post("/id/{id}")
-def save_tierlist(
+def _parse_moves(moves: str) -> list:
+    move_list = json.loads(moves) if moves else []
+    if not isinstance(move_list, list):
+        raise ValueError("Moves must be a list")
+    return move_list
+
+
+def _conflict_response(tierlist_id: int) -> tuple:
+    return (
+        SaveToast(
+            "This tierlist was changed elsewhere.",
+            ok=False,
+            action=A(
+                "Reload",
+                hx_get=f"{ar_tierlist.prefix}/id/{tierlist_id}",
+                hx_target="#main",
+                href="#",
+            ),
+        ),
+        HtmxResponseHeaders(trigger="tierlist-conflict"),
+    )
+
+
+@ar_tierlist.post("/id/{id}/moves")
+def save_tierlist_moves(
     id: int,
-    tierlist_data: str,
+    moves: str,
+    version: int,
     name: str,
     shared_groups: str,
-    htmx,
     auth,
     req,
 ) -> Any:
+    """Apply the editor's pending moves and answer with a toast, not a page."""
     owner_id = auth
     is_admin = req.scope.get("is_admin", False)
-    logger.debug(f"Saving tierlist. ID: {id}, Data: {tierlist_data}")
 
+    flush_autosave(id)
     tierlist = tierlists[id]
 
     if tierlist.owner_id != owner_id and not is_admin:
@@ -702,57 +1061,274 @@ def save_tierlist(
         )
         return RedirectResponse("/unauthorized", status_code=303)
 
-    tierlist.data = tierlist_data
-    tierlist.name = name
-    tierlists.update(tierlist)
+    try:
+        move_list = _parse_moves(moves)
+        new_data = (
+            apply_tier_moves(decode_tierlist(tierlist.data), move_list)
+            if move_list
+            else None
+        )
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Rejected moves for tierlist {id}: {e}")
+        return SaveToast("Could not save: invalid changes", ok=False)
+
+    if (tierlist.version or 0) != version or (move_list and new_data is None):
+        return _conflict_response(id)
+
+    with db.conn:
+        new_version = version
+        if new_data is not None:
+            new_version = write_tierlist_data(id, new_data, expected_version=version)
+            if new_version is None:
+                return _conflict_response(id)
+        if name != tierlist.name:
+            db.conn.execute("UPDATE db_tierlist SET name = ? WHERE id = ?", (name, id))
+        shares_changed = sync_shares(
+            db, "tierlist_share", "tierlist_id", id, parse_group_ids(shared_groups)
+        )
+    publish(CategoryChanged(tierlist.category, listing=shares_changed))
+    if new_data is not None:
+        schedule_taste_refresh(tierlist.category)
 
-    db.q("DELETE FROM tierlist_share WHERE tierlist_id = ?", [id])
-    if shared_groups:
-        for group_id in shared_groups.split(","):
-            if group_id:
-                tierlist_shares.insert(
-                    {"tierlist_id": id, "user_group_id": int(group_id)}
-                )
+    logger.debug(f"Applied {len(move_list)} moves to tierlist {id} (v{new_version})")
+    return (
+        SaveToast("Saved successfully"),
+        TierlistVersion(new_version)(hx_swap_oob="true"),
+        HtmxResponseHeaders(trigger="tierlist-saved"),
+    )
 
-    main_content = get_tierlist_editor(id, htmx, req)
-    toast = Div(
-        Ins("Saved successfully"),
-        Script("""
-            setTimeout(() => {
-                const toast = document.getElementById('toast');
-                if (toast) toast.classList.remove('show');
-            }, 3000);
-        """),
-        id="toast",
-        cls="show",
-        hx_swap_oob="true",
+
+# ============================================================================
+# FEATURE: AUTOSAVE
+# ============================================================================
+
+AUTOSAVE_DEBOUNCE_SECONDS = 5
+AUTOSAVE_MAX_WAIT_SECONDS = 30
+AUTOSAVE_CLIENT_FLUSH_MS = 2000
+
+
+class TierlistConflict(Exception):
+    """Edits were made against an outdated version of the tierlist."""
+
+
+def _stage_autosave(tierlist_id: int, version: int, moves: list) -> int:
+    """Fold `moves` into the tierlist's persisted draft; returns its version.
+
+    The draft is committed before this returns, so the edits survive a
+    restart and every worker sees them. Raises `TierlistConflict` when the
+    client's `version` is neither the draft's nor, without a draft, the
+    stored tierlist's.
+    """
+    with db.conn:
+        stored = tierlists[tierlist_id]
+        stored_version = stored.version or 0
+        drafts = db.q(
+            "SELECT * FROM tierlist_autosave WHERE tierlist_id = ?", [tierlist_id]
+        )
+        if drafts and drafts[0]["base_version"] != stored_version:
+            # Left behind by a save that replaced its base.
+            db.conn.execute(
+                "DELETE FROM tierlist_autosave WHERE tierlist_id = ?", (tierlist_id,)
+            )
+            drafts = []
+        if drafts:
+            draft = drafts[0]
+            base_version, current_version = draft["base_version"], draft["version"]
+            data = decode_tierlist(draft["data"])
+        else:
+            base_version = current_version = stored_version
+            data = decode_tierlist(stored.data)
+        if version != current_version:
+            raise TierlistConflict()
+        data = apply_tier_moves(data, moves)
+        if data is None:
+            raise TierlistConflict()
+
+        # The folded write bumps the stored version once, whatever the number
+        # of autosaves, so the draft is always one ahead of its base.
+        db.conn.execute(
+            """
+            INSERT INTO tierlist_autosave
+                (tierlist_id, category, base_version, version, data, updated_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+            ON CONFLICT (tierlist_id) DO UPDATE SET
+                base_version = excluded.base_version,
+                version = excluded.version,
+                data = excluded.data,
+                updated_at = excluded.updated_at
+            WHERE tierlist_autosave.version = ?
+            """,
+            (
+                tierlist_id,
+                stored.category,
+                base_version,
+                base_version + 1,
+                encode_tierlist(data),
+                datetime.now().isoformat(),
+                current_version,
+            ),
+        )
+        if not db.conn.changes():
+            raise TierlistConflict()
+        return base_version + 1
+
+
+def fold_autosave(tierlist_id: int) -> None:
+    """Write the tierlist's draft, if any, into the tierlist itself."""
+    with db.conn:
+        drafts = db.q(
+            "SELECT * FROM tierlist_autosave WHERE tierlist_id = ?", [tierlist_id]
+        )
+        if not drafts:
+            return
+        draft = drafts[0]
+        new_version = write_tierlist_data(
+            tierlist_id,
+            decode_tierlist(draft["data"]),
+            expected_version=draft["base_version"],
+        )
+        db.conn.execute(
+            "DELETE FROM tierlist_autosave WHERE tierlist_id = ?", (tierlist_id,)
+        )
+    if new_version is None:
+        # A full save replaced the base meanwhile; the editor's next save or
+        # autosave is checked against the new version and gets a conflict.
+        logger.warning(
+            f"Discarded autosave draft for tierlist {tierlist_id}: based on version {draft['base_version']}"
+        )
+        return
+    publish(CategoryChanged(draft["category"]))
+    schedule_taste_refresh(draft["category"])
+
+
+_autosaves = KeyedDebouncer(
+    lambda tierlist_id, _pending: fold_autosave(tierlist_id),
+    AUTOSAVE_DEBOUNCE_SECONDS,
+    AUTOSAVE_MAX_WAIT_SECONDS,
+)
+
+
+def flush_autosave(tierlist_id: int) -> None:
+    """Fold any autosave draft of the tierlist, from any worker, before reading it."""
+    _autosaves.flush(tierlist_id)
+    fold_autosave(tierlist_id)
+
+
+def flush_all_autosaves() -> None:
+    _autosaves.flush_all()
+
+
+@ar_tierlist.post("/id/{id}/autosave")
+def autosave_tierlist(id: int, moves: str, version: int, auth, req) -> Any:
+    """Persist moves in the tierlist's draft; folding it into the tierlist waits."""
+    owner_id = auth
+    is_admin = req.scope.get("is_admin", False)
+
+    tierlist = tierlists[id]
+    if tierlist.owner_id != owner_id and not is_admin:
+        return Response("Forbidden", status_code=403)
+
+    try:
+        new_version = _stage_autosave(id, version, _parse_moves(moves))
+    except TierlistConflict:
+        return _conflict_response(id)
+    except (ValueError, TypeError) as e:
+        logger.warning(f"Rejected autosave for tierlist {id}: {e}")
+        return SaveToast("Could not save: invalid changes", ok=False)
+    _autosaves.update(id, lambda pending: None)
+
+    return (
+        TierlistVersion(new_version)(hx_swap_oob="true"),
+        AutosaveStatus("All changes saved")(hx_swap_oob="true"),
+        HtmxResponseHeaders(trigger="tierlist-saved"),
     )
 
-    return main_content, toast
+
+TIERLIST_PAGE_SIZE = 30
 
 
 @ar_tierlist.get("/list", name="Browse Tierlists")
-def list_tierlists(htmx, req, category: str = "", mine_only: str = "") -> Any:
+def list_tierlists(
+    htmx, req, category: str = "", mine_only: str = "", cursor: str = ""
+) -> Any:
     user_id = req.scope["auth"]
     is_admin = req.scope.get("is_admin", False)
-    tierlist_list = get_accessible_tierlists(user_id, is_admin)
 
-    categories = sorted(set(tl.category for tl in tierlist_list if tl.category))
+    # Rating and comment counts are shown on the cards, so they count too.
+    etag = versioned_etag(
+        req, *list_page_keys(category if category != "All" else None, stats=True)
+    )
+    if (unchanged := not_modified(req, etag)) is not None:
+        return unchanged
 
-    if category and category != "All":
-        filtered_tierlists = [tl for tl in tierlist_list if tl.category == category]
-    else:
-        filtered_tierlists = tierlist_list
+    page_cursor = decode_cursor(cursor)
+    filtered_tierlists, next_cursor = split_page(
+        get_accessible_tierlists(
+            user_id,
+            is_admin,
+            category=category if category != "All" else None,
+            owner_id=user_id if mine_only == "true" else None,
+            cursor=page_cursor,
+            limit=TIERLIST_PAGE_SIZE,
+        ),
+        TIERLIST_PAGE_SIZE,
+    )
+    next_url = (
+        page_url(
+            f"{ar_tierlist.prefix}/list",
+            category=category,
+            mine_only=mine_only,
+            cursor=next_cursor,
+        )
+        if next_cursor
+        else None
+    )
 
-    if mine_only == "true":
-        filtered_tierlists = [tl for tl in filtered_tierlists if tl.owner_id == user_id]
+    if page_cursor:
+        from .users_router import get_user_avatars
 
-    enrich_tierlists_with_ratings(filtered_tierlists, user_id)
+        enrich_tierlists_with_ratings(filtered_tierlists, user_id)
+        avatars = get_user_avatars(tl.owner_id for tl in filtered_tierlists)
+        return with_etag(
+            (
+                *[
+                    TierlistListItem(tl, user_id, avatars[tl.owner_id])
+                    for tl in filtered_tierlists
+                ],
+                LoadMore(next_url),
+            ),
+            etag,
+        )
+
+    categories = get_accessible_tierlist_categories(user_id, is_admin)
+
+    def render_list():
+        enrich_tierlists_with_ratings(filtered_tierlists, user_id)
+        return TierlistList(
+            filtered_tierlists,
+            user_id,
+            categories,
+            category,
+            mine_only == "true",
+            next_url,
+        )
 
-    content = TierlistList(
-        filtered_tierlists, user_id, categories, category, mine_only == "true"
+    content = cached_fragment(
+        "TierlistList",
+        (
+            user_id,
+            is_admin,
+            category,
+            mine_only,
+            tuple(categories),
+            tuple(tl.id for tl in filtered_tierlists),
+            next_url,
+        ),
+        render_list,
+        categories=categories,
+        stats=categories,
     )
-    return get_full_layout(content, htmx, is_admin)
+    return with_etag(get_full_layout(content, htmx, is_admin), etag)
 
 
 @ar_tierlist.delete("/id/{id}")
@@ -767,7 +1343,12 @@ def delete_tierlist(id: str, htmx, auth, req) -> Any:
         )
         return RedirectResponse("/unauthorized", status_code=303)
 
-    tierlists.delete(id)
+    with db.conn:
+        apply_rating_stats_delta(db, tierlist.category, tierlist.data, None)
+        db.conn.execute("DELETE FROM tierlist_autosave WHERE tierlist_id = ?", (id,))
+        tierlists.delete(id)
+    publish(CategoryChanged(tierlist.category, listing=True))
+    schedule_taste_refresh(tierlist.category)
 
     return list_tierlists(htmx, req)
 
@@ -844,22 +1425,47 @@ def rate_tierlist(id: int, rating: int, auth) -> Any:
         enrich_tierlists_with_ratings([tierlist], user_id)
         return rating_display(tierlist)
 
-    user_rating = get_user_rating(id, user_id)
-    if user_rating:
-        if user_rating.rating == rating:
-            tierlist_ratings.delete(user_rating.id)
+    with db.conn:
+        existing = db.q(
+            "SELECT id, rating FROM tierlist_rating WHERE tierlist_id = ? AND user_id = ?",
+            [id, user_id],
+        )
+        old_rating = existing[0]["rating"] if existing else None
+        if old_rating == rating:
+            new_rating = None
+            db.conn.execute(
+                "DELETE FROM tierlist_rating WHERE id = ?", (existing[0]["id"],)
+            )
+        elif existing:
+            new_rating = rating
+            db.conn.execute(
+                "UPDATE tierlist_rating SET rating = ? WHERE id = ?",
+                (rating, existing[0]["id"]),
+            )
         else:
-            user_rating.rating = rating
-            tierlist_ratings.update(user_rating)
-    else:
-        tierlist_ratings.insert(
-            tierlist_id=id,
-            user_id=user_id,
-            rating=rating,
+            new_rating = rating
+            db.conn.execute(
+                "INSERT INTO tierlist_rating (tierlist_id, user_id, rating) VALUES (?, ?, ?)",
+                (id, user_id, rating),
+            )
+        db.conn.execute(
+            """
+            UPDATE db_tierlist SET
+                love_count = COALESCE(love_count, 0) + ?,
+                tomato_count = COALESCE(tomato_count, 0) + ?
+            WHERE id = ?
+            """,
+            (
+                (new_rating == 1) - (old_rating == 1),
+                (new_rating == -1) - (old_rating == -1),
+                id,
+            ),
         )
 
-    get_user_rating.cache_clear()
+    publish(UserRatingChanged(id, user_id))
     tierlist = tierlists[id]
+    publish(TierlistStatsChanged(tierlist.category))
+    publish_rating_update(tierlist)
     enrich_tierlists_with_ratings([tierlist], user_id)
     return rating_display(tierlist)
 
@@ -869,10 +1475,10 @@ def rate_tierlist(id: int, rating: int, auth) -> Any:
 # ============================================================================
 
 
-def Comment(comment: TierlistComment) -> Any:
+def Comment(comment: TierlistComment, author: tuple[str, str] | None = None) -> Any:
     from .users_router import get_user_avatar
 
-    username, avatar_url = get_user_avatar(comment.user_id)
+    username, avatar_url = author or get_user_avatar(comment.user_id)
     user_rating = get_user_rating(comment.tierlist_id, comment.user_id)
     vote_indicator = get_rating_repr(user_rating.rating) if user_rating else ""
 
@@ -892,9 +1498,14 @@ def Comment(comment: TierlistComment) -> Any:
 
 @ar_tierlist.get("/id/{id}/comments")
 def get_comments(id: int) -> Any:
+    from .users_router import get_user_avatars
+
     comment_list = tierlist_comments(
         "tierlist_id = ?", (id,), order_by="created_at DESC"
     )
+    authors = get_user_avatars(c.user_id for c in comment_list)
+    # Warms the rating cache so each Comment's vote indicator is a lookup.
+    load_user_ratings(id, (c.user_id for c in comment_list))
 
     return Article(
         Header(
@@ -902,7 +1513,7 @@ def get_comments(id: int) -> Any:
             H3("Comments"),
         ),
         Div(
-            *[Comment(c) for c in comment_list]
+            *[Comment(c, authors[c.user_id]) for c in comment_list]
             if comment_list
             else [P("No comments yet")],
             cls="comments-list",
@@ -932,14 +1543,19 @@ def get_comments(id: int) -> Any:
 def post_comment(id: int, comment: str, auth) -> Any:
     user_id = auth
 
-    tierlist_comments.insert(
-        tierlist_id=id,
-        user_id=user_id,
-        comment=comment,
-        created_at=datetime.now().isoformat(),
-    )
+    with db.conn:
+        db.conn.execute(
+            "INSERT INTO tierlist_comment (tierlist_id, user_id, comment, created_at) VALUES (?, ?, ?, ?)",
+            (id, user_id, comment, datetime.now().isoformat()),
+        )
+        db.conn.execute(
+            "UPDATE db_tierlist SET comment_count = COALESCE(comment_count, 0) + 1 WHERE id = ?",
+            (id,),
+        )
 
     tierlist = tierlists[id]
+    publish(TierlistStatsChanged(tierlist.category))
+    publish_rating_update(tierlist)
     enrich_tierlists_with_ratings([tierlist], user_id)
 
     return (
@@ -948,6 +1564,58 @@ def post_comment(id: int, comment: str, auth) -> Any:
     )
 
 
+# ============================================================================
+# FEATURE: LIVE RATINGS
+# ============================================================================
+
+RATINGS_TOPIC = "tierlist-ratings"
+
+
+def publish_rating_update(tierlist: DBTierlist) -> None:
+    """Push fresh counts to every open list view; call after the write commits."""
+    get_event_bus().publish(RATINGS_TOPIC, replace(tierlist))
+
+
+def LiveRatings() -> Any:
+    """Hidden SSE listener that applies out-of-band `rating_display` swaps."""
+    return Div(
+        Div(sse_swap="rating", hx_swap="none"),
+        hx_ext="sse",
+        sse_connect=f"{ar_tierlist.prefix}/live",
+        hidden=True,
+    )
+
+
+@ar_tierlist.get("/live")
+async def live_ratings(req) -> Any:
+    user_id = req.scope["auth"]
+    is_admin = req.scope.get("is_admin", False)
+
+    def viewer_rating(tierlist: DBTierlist) -> tuple[bool, int | None]:
+        # Checked per event so shares granted or revoked mid-stream apply.
+        if not can_view_tierlist(tierlist, user_id, is_admin):
+            return False, None
+        user_rating = get_user_rating(tierlist.id, user_id)
+        return True, user_rating.rating if user_rating else None
+
+    async def stream():
+        with get_event_bus().subscribe(RATINGS_TOPIC) as updates:
+            while True:
+                tierlist = replace(await updates.get())
+                visible, rating = await asyncio.to_thread(viewer_rating, tierlist)
+                if not visible:
+                    continue
+                tierlist.user_rating = rating  # type: ignore
+                yield sse_message(
+                    rating_display(
+                        tierlist, hx_swap_oob=f"true:#ratings-{tierlist.id}"
+                    ),
+                    "rating",
+                )
+
+    return EventStream(stream())
+
+
 # ============================================================================
 # EXPORT
 # ============================================================================
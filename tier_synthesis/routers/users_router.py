@@ -1,8 +1,10 @@
 from fasthtml.common import *  # type: ignore
 from .base_layout import get_full_layout
+from services.invalidation import GroupsChanged, UserChanged, publish, subscribe
 from dataclasses import dataclass
-from functools import lru_cache
+from typing import Iterable
 import os
+import time
 import logging
 
 logger = logging.getLogger(__name__)
@@ -73,44 +75,110 @@ DEFAULT_AVATAR = "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' w
 ANONYMOUS_AVATAR = "data:image/svg+xml,%3Csvg xmlns='http://www.w3.org/2000/svg' width='48' height='48'%3E%3Ccircle cx='24' cy='24' r='20' fill='%23999'/%3E%3Ctext x='24' y='30' text-anchor='middle' fill='white' font-size='20'%3E%3F%3C/text%3E%3C/svg%3E"
 
 
-@lru_cache(maxsize=128)
-def get_user_avatar(owner_id: str):
-    user_data = db.q("SELECT username, avatar FROM user WHERE id = ?", [owner_id])
-    if user_data:
-        username = user_data[0]["username"]
-        avatar_hash = user_data[0].get("avatar")
-        if avatar_hash:
-            avatar_url = f"https://cdn.discordapp.com/avatars/{owner_id}/{avatar_hash}.png?size=128"
+AVATAR_CACHE_MAX_ENTRIES = 4096
+
+# user id -> (cache version, (username, avatar_url))
+_avatar_cache: dict[str, tuple[int, tuple[str, str]]] = {}
+_avatar_cache_version = 0
+
+
+def _avatar_url(owner_id: str, avatar_hash: str | None) -> str:
+    if avatar_hash:
+        return f"https://cdn.discordapp.com/avatars/{owner_id}/{avatar_hash}.png?size=128"
+    return DEFAULT_AVATAR
+
+
+def get_user_avatars(owner_ids: Iterable[str]) -> dict[str, tuple[str, str]]:
+    """Resolve (username, avatar_url) for many users with at most one query."""
+    version = _avatar_cache_version
+    result = {}
+    missing = []
+    for owner_id in set(owner_ids):
+        cached = _avatar_cache.get(owner_id)
+        if cached and cached[0] == version:
+            result[owner_id] = cached[1]
         else:
-            avatar_url = DEFAULT_AVATAR
-        return username, avatar_url
-    return "Unknown", DEFAULT_AVATAR
+            missing.append(owner_id)
+
+    if missing:
+        placeholders = ",".join("?" * len(missing))
+        rows = db.q(
+            f"SELECT id, username, avatar FROM user WHERE id IN ({placeholders})",
+            missing,
+        )
+        found = {
+            row["id"]: (row["username"], _avatar_url(row["id"], row.get("avatar")))
+            for row in rows
+        }
+        if len(_avatar_cache) + len(missing) > AVATAR_CACHE_MAX_ENTRIES:
+            _avatar_cache.clear()
+        for owner_id in missing:
+            result[owner_id] = found.get(owner_id, ("Unknown", DEFAULT_AVATAR))
+            _avatar_cache[owner_id] = (version, result[owner_id])
+
+    return result
+
+
+def get_user_avatar(owner_id: str):
+    return get_user_avatars([owner_id])[owner_id]
+
+
+def invalidate_user_avatars(*user_ids: str) -> None:
+    """Drop cached avatars for `user_ids`, or every entry when called bare."""
+    global _avatar_cache_version
+
+    if user_ids:
+        for user_id in user_ids:
+            _avatar_cache.pop(user_id, None)
+    else:
+        _avatar_cache_version += 1
 
 
 def get_anonymous_avatar():
     return "Anonymous", ANONYMOUS_AVATAR
 
 
-def users_share_group(user_id_1: str, user_id_2: str) -> bool:
-    if user_id_1 == user_id_2:
-        return True
+# ============================================================================
+# USER CONTEXT
+# ============================================================================
 
-    result = db.q(
-        """
-        SELECT COUNT(*) as shared_count
-        FROM user_group_membership ugm1
-        JOIN user_group_membership ugm2
-        ON ugm1.group_id = ugm2.group_id
-        WHERE ugm1.user_id = ? AND ugm2.user_id = ?
-        """,
-        [user_id_1, user_id_2],
-    )
+USER_CONTEXT_TTL_SECONDS = 30
 
-    return result[0]["shared_count"] > 0 if result else False
 
+@dataclass
+class UserContext:
+    """Everything per-request code needs about the signed-in user."""
 
-def get_shared_group_users(user_id):
-    result = db.q(
+    user: User
+    is_admin: bool
+    groups: tuple[dict, ...]
+    shared_users: frozenset[str]
+    loaded_at: float
+
+    @property
+    def group_ids(self) -> frozenset[int]:
+        return frozenset(group["id"] for group in self.groups)
+
+
+_user_contexts: dict[str, UserContext] = {}
+
+
+def _load_user_context(user_id: str) -> UserContext | None:
+    rows = db.q("SELECT * FROM user WHERE id = ?", [user_id])
+    if not rows:
+        return None
+
+    user = User(**rows[0])
+    groups = db.q(
+        """
+        SELECT user_group.*
+        FROM user_group
+        JOIN user_group_membership ON user_group.id = user_group_membership.group_id
+        WHERE user_group_membership.user_id = ?
+        """,
+        [user_id],
+    )
+    shared_users = db.q(
         """
         SELECT DISTINCT ugm2.user_id
         FROM user_group_membership ugm1
@@ -119,7 +187,65 @@ def get_shared_group_users(user_id):
         """,
         [user_id],
     )
-    return {row["user_id"] for row in result}
+    return UserContext(
+        user=user,
+        is_admin=bool(user.is_admin)
+        or user_id == os.environ.get("ADMIN_USER_ID", ""),
+        groups=tuple(groups),
+        shared_users=frozenset(row["user_id"] for row in shared_users),
+        loaded_at=time.monotonic(),
+    )
+
+
+def get_user_context(user_id: str) -> UserContext | None:
+    """Cached user row, admin flag and group data, refreshed after a short TTL."""
+    context = _user_contexts.get(user_id)
+    if context and time.monotonic() - context.loaded_at < USER_CONTEXT_TTL_SECONDS:
+        return context
+
+    context = _load_user_context(user_id)
+    if context is None:
+        _user_contexts.pop(user_id, None)
+    else:
+        _user_contexts[user_id] = context
+    return context
+
+
+def invalidate_user_context(*user_ids: str) -> None:
+    """Drop cached contexts for `user_ids`, or every context when called bare."""
+    if user_ids:
+        for user_id in user_ids:
+            _user_contexts.pop(user_id, None)
+    else:
+        _user_contexts.clear()
+
+
+def _on_user_changed(event: UserChanged) -> None:
+    user_ids = (event.user_id,) if event.user_id else ()
+    invalidate_user_avatars(*user_ids)
+    invalidate_user_context(*user_ids)
+
+
+subscribe(UserChanged, _on_user_changed)
+subscribe(GroupsChanged, lambda event: invalidate_user_context())
+
+
+def users_share_group(user_id_1: str, user_id_2: str) -> bool:
+    if user_id_1 == user_id_2:
+        return True
+
+    context = get_user_context(user_id_1)
+    return context is not None and user_id_2 in context.shared_users
+
+
+def get_shared_group_users(user_id):
+    context = get_user_context(user_id)
+    return set(context.shared_users) if context else set()
+
+
+def get_user_groups(user_id: str) -> list[dict]:
+    context = get_user_context(user_id)
+    return list(context.groups) if context else []
 
 
 ar_users = APIRouter(prefix="/admin/users")
@@ -143,6 +269,7 @@ def toggle_authorized(user_id: str, request) -> Any:
     user = users[user_id]
     user.authorized = not user.authorized
     users.update(user)
+    publish(UserChanged(user_id))
     return user.render_row()
 
 
@@ -155,6 +282,7 @@ def toggle_admin(user_id: str, request) -> Any:
     user = users[user_id]
     user.is_admin = not user.is_admin
     users.update(user)
+    publish(UserChanged(user_id))
     return user.render_row()
 
 
@@ -0,0 +1,143 @@
+"""Persisted, monotonic data version counters.
+
+Every committed write bumps the counters it touches as part of
+`services.invalidation.publish`:
+
+- `("category", name)` and `("category", ANY_CATEGORY)` for tierlist, image
+  and share writes in a category
+- `("categories", "")` when a write can change which categories a filter
+  lists (creates, deletes, category moves, share edits)
+- `("stats", name)` and `("stats", ANY_CATEGORY)` for rating and comment
+  counts, which only the tierlist lists show
+- `("user", user_id)` when a user's profile, access or own ratings change
+- `("global", "")` for changes with wide reach (groups, any user's name or
+  avatar)
+
+Unlike the in-process versions in `fragment_cache`, these live in SQLite, so
+they survive restarts and agree across workers. That makes them usable as
+HTTP validators: a handler can compare a few integers against the client's
+ETag instead of rendering the page to find out nothing changed.
+"""
+
+from typing import Any, Iterable
+from fasthtml.common import database
+import os
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+ANY_CATEGORY = "*"
+
+VersionKey = tuple[str, str]
+
+db = database(os.environ.get("DB_PATH", "app/database.db"))
+db.execute("""
+    CREATE TABLE IF NOT EXISTS data_version (
+        scope TEXT NOT NULL,
+        key TEXT NOT NULL,
+        version INTEGER NOT NULL DEFAULT 0,
+        PRIMARY KEY (scope, key)
+    )
+""")
+
+
+def category_key(category: str) -> VersionKey:
+    return ("category", category)
+
+
+def user_key(user_id: str | None) -> VersionKey:
+    return ("user", user_id or "")
+
+
+def stats_key(category: str) -> VersionKey:
+    return ("stats", category)
+
+
+GLOBAL_KEY: VersionKey = ("global", "")
+ANY_CATEGORY_KEY: VersionKey = category_key(ANY_CATEGORY)
+CATEGORY_SET_KEY: VersionKey = ("categories", "")
+
+
+def bump_versions(*keys: VersionKey) -> None:
+    keys = tuple(dict.fromkeys(keys))
+    if not keys:
+        return
+    db.conn.executemany(
+        """
+        INSERT INTO data_version (scope, key, version) VALUES (?, ?, 1)
+        ON CONFLICT (scope, key) DO UPDATE SET version = version + 1
+        """,
+        keys,
+    )
+
+
+def get_versions(*keys: VersionKey) -> tuple[int, ...]:
+    """Current counters for `keys`, in order; 0 for anything never written."""
+    if not keys:
+        return ()
+    placeholders = ",".join("(?, ?)" for _ in keys)
+    found = {
+        (row["scope"], row["key"]): row["version"]
+        for row in db.q(
+            f"SELECT scope, key, version FROM data_version WHERE (scope, key) IN (VALUES {placeholders})",
+            [part for key in keys for part in key],
+        )
+    }
+    return tuple(found.get(key, 0) for key in keys)
+
+
+def get_category_version(category: str) -> int:
+    return get_versions(category_key(category))[0]
+
+
+def get_user_version(user_id: str) -> int:
+    return get_versions(user_key(user_id))[0]
+
+
+def list_page_keys(category: str | None, stats: bool = False) -> tuple[VersionKey, ...]:
+    """Keys behind a list page filtered to `category`, or to every category.
+
+    The filter dropdown is covered by `CATEGORY_SET_KEY`, so a filtered page
+    ignores writes in other categories that leave the set alone.
+    """
+    scope = category or ANY_CATEGORY
+    keys = (CATEGORY_SET_KEY, category_key(scope))
+    return keys + (stats_key(scope),) if stats else keys
+
+
+def keys_for_event(event: Any) -> Iterable[VersionKey]:
+    from services.invalidation import (
+        CategoryChanged,
+        GroupsChanged,
+        TierlistStatsChanged,
+        UserChanged,
+        UserRatingChanged,
+    )
+
+    if isinstance(event, CategoryChanged):
+        if event.category:
+            yield category_key(event.category)
+        yield ANY_CATEGORY_KEY
+        if event.listing:
+            yield CATEGORY_SET_KEY
+    elif isinstance(event, TierlistStatsChanged):
+        if event.category:
+            yield stats_key(event.category)
+        yield stats_key(ANY_CATEGORY)
+    elif isinstance(event, UserChanged):
+        # Names and avatars show up on everyone's pages.
+        if event.user_id:
+            yield user_key(event.user_id)
+        yield GLOBAL_KEY
+    elif isinstance(event, GroupsChanged):
+        yield GLOBAL_KEY
+    elif isinstance(event, UserRatingChanged):
+        yield user_key(event.user_id)
+
+
+def bump_for_event(event: Any) -> None:
+    try:
+        bump_versions(*keys_for_event(event))
+    except Exception:
+        logger.exception(f"Could not bump data versions for {event!r}")
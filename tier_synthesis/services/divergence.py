@@ -0,0 +1,156 @@
+"""Vectorized rating statistics and "hot take" divergences.
+
+Tierlist rows are flattened into parallel arrays (one entry per placed image)
+and grouped by (category, image) so means, counts and variances for a whole
+category, or many categories, come out of a handful of `np.bincount` calls.
+"""
+
+from dataclasses import dataclass
+from services.tierlist_codec import decode_tierlist_arrays
+import numpy as np
+
+MIN_DIVERGENCE = 1.0
+
+
+@dataclass
+class RatingEntries:
+    """Every placement in a set of tierlist rows, as parallel arrays."""
+
+    row_index: np.ndarray  # which input row each entry came from
+    group: np.ndarray  # category code of the row
+    image_ids: np.ndarray
+    ratings: np.ndarray
+    categories: list[str]
+
+    @property
+    def keys(self) -> np.ndarray:
+        """(category, image) packed into one int64 per entry."""
+        return (self.group.astype(np.int64) << 32) | self.image_ids
+
+
+@dataclass
+class RatingStats:
+    """Per-(category, image) aggregates; `inverse` maps entries to their key."""
+
+    keys: np.ndarray
+    inverse: np.ndarray
+    count: np.ndarray
+    mean: np.ndarray
+    variance: np.ndarray
+
+
+def flatten_ratings(rows: list[dict], categories: list[str] | None = None) -> RatingEntries:
+    """Flatten rows with `category` and `data` columns into parallel arrays."""
+    categories = categories or sorted({row["category"] for row in rows})
+    category_codes = {category: code for code, category in enumerate(categories)}
+
+    decoded = [decode_tierlist_arrays(row["data"]) for row in rows]
+    lengths = np.array([len(ids) for ids, _ in decoded], dtype=np.int64)
+    row_index = np.repeat(np.arange(len(rows)), lengths)
+    row_groups = np.array([category_codes[row["category"]] for row in rows], dtype=np.int64)
+
+    return RatingEntries(
+        row_index=row_index,
+        group=row_groups[row_index],
+        image_ids=np.concatenate([ids for ids, _ in decoded]) if decoded else np.zeros(0, np.int64),
+        ratings=np.concatenate([r for _, r in decoded]).astype(np.float64) if decoded else np.zeros(0),
+        categories=categories,
+    )
+
+
+def rating_stats(entries: RatingEntries) -> RatingStats:
+    keys, inverse = np.unique(entries.keys, return_inverse=True)
+    count = np.bincount(inverse, minlength=len(keys))
+    total = np.bincount(inverse, weights=entries.ratings, minlength=len(keys))
+    total_sq = np.bincount(inverse, weights=entries.ratings**2, minlength=len(keys))
+    mean = total / np.maximum(count, 1)
+    return RatingStats(
+        keys=keys,
+        inverse=inverse,
+        count=count,
+        mean=mean,
+        variance=np.maximum(total_sq / np.maximum(count, 1) - mean**2, 0.0),
+    )
+
+
+def _baseline_arrays(
+    baseline: list[dict], categories: list[str]
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sorted (keys, count, mean) arrays from stored `image_rating_stats` rows."""
+    codes = {category: code for code, category in enumerate(categories)}
+    keys = np.array(
+        [(codes[row["category"]] << 32) | row["image_id"] for row in baseline],
+        dtype=np.int64,
+    )
+    count = np.array([row["count"] for row in baseline], dtype=np.int64)
+    total = np.array([row["sum"] for row in baseline], dtype=np.float64)
+    order = np.argsort(keys)
+    return keys[order], count[order], total[order] / np.maximum(count[order], 1)
+
+
+def find_divergences(
+    rows: list[dict],
+    user_id: str,
+    limit_per_category: int | None = None,
+    min_divergence: float = MIN_DIVERGENCE,
+    baseline: list[dict] | None = None,
+) -> dict[str, list[dict]]:
+    """Where `user_id` differs from everyone's average, per category.
+
+    `rows` need `owner_id`, `category` and `data`. Averages come from all of
+    `rows`, or from `baseline` (stored `image_rating_stats` rows) when given,
+    in which case `rows` only needs the user's own tierlists. When the user
+    has several tierlists in a category, the last row's placement counts as
+    their rating. Results are sorted by divergence, strongest first.
+    """
+    if not rows:
+        return {}
+
+    categories = sorted(
+        {row["category"] for row in rows} | {row["category"] for row in baseline or ()}
+    )
+    entries = flatten_ratings(rows, categories)
+    if baseline is None:
+        stats = rating_stats(entries)
+        keys, counts, means = stats.keys, stats.count, stats.mean
+    else:
+        keys, counts, means = _baseline_arrays(baseline, categories)
+
+    owned_rows = np.array([row["owner_id"] == user_id for row in rows])
+    user_entries = np.flatnonzero(owned_rows[entries.row_index])
+    if not len(user_entries) or not len(keys):
+        return {}
+
+    # Keep only the last entry per (category, image) among the user's own.
+    entry_keys = entries.keys
+    _, last_from_end = np.unique(entry_keys[user_entries][::-1], return_index=True)
+    user_entries = user_entries[len(user_entries) - 1 - last_from_end]
+
+    key_index = np.minimum(np.searchsorted(keys, entry_keys[user_entries]), len(keys) - 1)
+    known = keys[key_index] == entry_keys[user_entries]
+    user_entries, key_index = user_entries[known], key_index[known]
+
+    user_ratings = entries.ratings[user_entries]
+    averages = means[key_index]
+    divergence = np.abs(user_ratings - averages)
+
+    selected = (counts[key_index] > 1) & (divergence > min_divergence)
+    user_entries, user_ratings = user_entries[selected], user_ratings[selected]
+    averages, divergence = averages[selected], divergence[selected]
+
+    result: dict[str, list[dict]] = {}
+    for i in np.argsort(-divergence, kind="stable"):
+        category = entries.categories[entries.group[user_entries[i]]]
+        category_divergences = result.setdefault(category, [])
+        if limit_per_category is not None and len(category_divergences) >= limit_per_category:
+            continue
+        category_divergences.append(
+            {
+                "image_id": int(entries.image_ids[user_entries[i]]),
+                "user_rating": int(user_ratings[i]),
+                "avg_rating": float(averages[i]),
+                "divergence": float(divergence[i]),
+                "is_higher": bool(user_ratings[i] > averages[i]),
+            }
+        )
+    return result
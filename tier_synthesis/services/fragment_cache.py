@@ -0,0 +1,143 @@
+from collections import OrderedDict
+from typing import Any, Callable, Iterable
+from fasthtml.common import NotStr, to_xml
+from services.invalidation import (
+    CategoryChanged,
+    GroupsChanged,
+    TierlistStatsChanged,
+    UserChanged,
+    subscribe,
+)
+import os
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+FRAGMENT_CACHE_MAX_BYTES = int(
+    os.environ.get("FRAGMENT_CACHE_MAX_BYTES", 16 * 1024 * 1024)
+)
+
+
+# ============================================================================
+# DATA VERSIONS
+# ============================================================================
+
+_versions: dict[tuple[str, str], int] = {}
+_versions_lock = threading.Lock()
+
+
+def get_data_version(scope: str, key: str = "") -> int:
+    return _versions.get((scope, key), 0)
+
+
+def _bump(scope: str, key: str = "") -> None:
+    with _versions_lock:
+        _versions[(scope, key)] = _versions.get((scope, key), 0) + 1
+
+
+def invalidate_category(*categories: str) -> None:
+    """Bump on `CategoryChanged`; write paths publish the event instead."""
+    for category in categories:
+        if category:
+            _bump("category", category)
+
+
+def invalidate_user(*user_ids: str) -> None:
+    """Call after a user's profile (name, avatar) or access rights change."""
+    for user_id in user_ids:
+        _bump("user", user_id)
+
+
+def invalidate_all() -> None:
+    """Call after changes with wide reach, such as group membership edits."""
+    _bump("global")
+
+
+subscribe(CategoryChanged, lambda event: invalidate_category(event.category))
+subscribe(TierlistStatsChanged, lambda event: _bump("stats", event.category))
+# Usernames, avatars and access rights are baked into many cached fragments.
+subscribe(UserChanged, lambda event: invalidate_all())
+subscribe(GroupsChanged, lambda event: invalidate_all())
+
+
+# ============================================================================
+# FRAGMENT CACHE
+# ============================================================================
+
+
+class FragmentCache:
+    """LRU cache of serialized HTML bounded by total size in bytes."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self._entries: OrderedDict[tuple, str] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: tuple) -> str | None:
+        with self._lock:
+            html = self._entries.get(key)
+            if html is not None:
+                self._entries.move_to_end(key)
+            return html
+
+    def put(self, key: tuple, html: str) -> None:
+        if len(html) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self.size -= len(self._entries.pop(key))
+            self._entries[key] = html
+            self.size += len(html)
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= len(evicted)
+
+
+_fragment_cache = FragmentCache(FRAGMENT_CACHE_MAX_BYTES)
+
+
+def _serialize(fragment: Any) -> str:
+    if fragment is None:
+        return ""
+    if isinstance(fragment, (list, tuple)):
+        return "".join(to_xml(part) for part in fragment if part is not None)
+    return to_xml(fragment)
+
+
+def cached_fragment(
+    component: str,
+    inputs: tuple,
+    render: Callable[[], Any],
+    categories: Iterable[str] = (),
+    users: Iterable[str] = (),
+    stats: Iterable[str] = (),
+) -> Any:
+    """Render `component` once per combination of inputs and data versions.
+
+    `inputs` must capture everything the rendered HTML depends on besides the
+    data versions of `categories` and `users`, and the rating and comment
+    counts of tierlists in `stats`. Returns None for empty fragments
+    so callers can keep treating missing sections the usual way.
+    """
+    versions = (
+        get_data_version("global"),
+        tuple((c, get_data_version("category", c)) for c in sorted(set(categories))),
+        tuple((u, get_data_version("user", u)) for u in sorted(set(users))),
+        tuple((c, get_data_version("stats", c)) for c in sorted(set(stats))),
+    )
+    # Signed image URLs roll over at midnight UTC, so cached HTML must too.
+    url_epoch = int(time.time()) // 86400
+    key = (component, inputs, versions, url_epoch)
+
+    html = _fragment_cache.get(key)
+    if html is None:
+        html = _serialize(render())
+        _fragment_cache.put(key, html)
+    else:
+        logger.debug(f"Fragment cache hit for {component}")
+
+    return NotStr(html) if html else None
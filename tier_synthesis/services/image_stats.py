@@ -0,0 +1,176 @@
+"""Maintained per-(category, image) rating aggregates.
+
+`image_rating_stats` holds the sum, sum of squares and count of every rating
+an image received in a category's tierlists. Tierlist writes apply the
+difference between the old and new placements inside their own transaction,
+so readers get averages from an indexed query instead of decoding every
+tierlist in the category.
+"""
+
+from typing import Any
+from services.tierlist_codec import decode_tierlist_arrays
+import numpy as np
+
+# Weight of the category-wide mean in Bayesian averages, in "virtual ratings".
+BAYESIAN_PRIOR_WEIGHT = 3
+
+# Written out verbatim so ORDER BY can use idx_image_rating_stats_mean.
+MEAN_EXPR = "(CAST(sum AS REAL) / count)"
+
+_UPSERT = """
+    INSERT INTO image_rating_stats (category, image_id, sum, sum_sq, count)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT (category, image_id) DO UPDATE SET
+        sum = sum + excluded.sum,
+        sum_sq = sum_sq + excluded.sum_sq,
+        count = count + excluded.count
+"""
+
+
+def create_image_rating_stats_index(db: Any) -> None:
+    db.execute(
+        f"CREATE INDEX IF NOT EXISTS idx_image_rating_stats_mean "
+        f"ON image_rating_stats (category, {MEAN_EXPR}, image_id)"
+    )
+
+
+def contribution_delta(old_data, new_data) -> list[tuple[int, int, int, int]]:
+    """(image_id, d_sum, d_sum_sq, d_count) turning old placements into new ones."""
+    old_ids, old_ratings = decode_tierlist_arrays(old_data) if old_data else ([], [])
+    new_ids, new_ratings = decode_tierlist_arrays(new_data) if new_data else ([], [])
+
+    ids = np.concatenate([np.asarray(old_ids, np.int64), np.asarray(new_ids, np.int64)])
+    ratings = np.concatenate(
+        [-np.asarray(old_ratings, np.int64), np.asarray(new_ratings, np.int64)]
+    )
+    signs = np.concatenate(
+        [-np.ones(len(old_ids), np.int64), np.ones(len(new_ids), np.int64)]
+    )
+    if not len(ids):
+        return []
+
+    unique_ids, inverse = np.unique(ids, return_inverse=True)
+    d_sum = np.bincount(inverse, weights=ratings).astype(np.int64)
+    d_sum_sq = np.bincount(inverse, weights=signs * ratings**2).astype(np.int64)
+    d_count = np.bincount(inverse, weights=signs).astype(np.int64)
+
+    changed = (d_sum != 0) | (d_sum_sq != 0) | (d_count != 0)
+    return list(
+        zip(
+            unique_ids[changed].tolist(),
+            d_sum[changed].tolist(),
+            d_sum_sq[changed].tolist(),
+            d_count[changed].tolist(),
+        )
+    )
+
+
+def apply_rating_stats_delta(db: Any, category: str, old_data, new_data) -> None:
+    """Move a tierlist's contribution from `old_data` to `new_data`.
+
+    Meant to run inside the caller's transaction (`with db.conn:`); pass None
+    for `old_data` on insert and for `new_data` on delete.
+    """
+    delta = contribution_delta(old_data, new_data)
+    if not delta:
+        return
+    db.conn.executemany(
+        _UPSERT,
+        [(category, image_id, *changes) for image_id, *changes in delta],
+    )
+    db.conn.execute("DELETE FROM image_rating_stats WHERE count <= 0")
+
+
+def rebuild_image_rating_stats(db: Any) -> int:
+    """Recompute the whole aggregate from db_tierlist; returns rows written."""
+    totals: dict[tuple[str, int], list[int]] = {}
+    for row in db.q(
+        "SELECT category, data FROM db_tierlist WHERE category IS NOT NULL"
+    ):
+        for image_id, d_sum, d_sum_sq, d_count in contribution_delta(None, row["data"]):
+            entry = totals.setdefault((row["category"], image_id), [0, 0, 0])
+            entry[0] += d_sum
+            entry[1] += d_sum_sq
+            entry[2] += d_count
+
+    with db.conn:
+        db.conn.execute("DELETE FROM image_rating_stats")
+        db.conn.executemany(
+            "INSERT INTO image_rating_stats (category, image_id, sum, sum_sq, count) VALUES (?, ?, ?, ?, ?)",
+            [(category, image_id, *entry) for (category, image_id), entry in totals.items()],
+        )
+    return len(totals)
+
+
+# ============================================================================
+# QUERIES
+# ============================================================================
+
+
+def get_ranked_images(
+    db: Any,
+    category: str,
+    limit: int,
+    descending: bool = True,
+    min_count: int = 2,
+    bayesian: bool = False,
+) -> list[dict]:
+    """Top (or bottom) images of a category by average rating.
+
+    With `bayesian`, averages are shrunk towards the category mean by
+    `BAYESIAN_PRIOR_WEIGHT` virtual ratings so thinly rated images don't
+    dominate either end.
+    """
+    direction = "DESC" if descending else "ASC"
+    if not bayesian:
+        return db.q(
+            f"""
+            SELECT image_id, {MEAN_EXPR} AS avg_rating, count AS rating_count
+            FROM image_rating_stats
+            WHERE category = ? AND count >= ?
+            ORDER BY {MEAN_EXPR} {direction}, image_id {direction}
+            LIMIT ?
+            """,
+            [category, min_count, limit],
+        )
+
+    return db.q(
+        f"""
+        WITH prior AS (
+            SELECT CAST(SUM(sum) AS REAL) / SUM(count) AS mean
+            FROM image_rating_stats WHERE category = ?
+        )
+        SELECT
+            image_id,
+            {MEAN_EXPR} AS avg_rating,
+            count AS rating_count,
+            (prior.mean * ? + sum) / (? + count) AS bayesian_rating
+        FROM image_rating_stats, prior
+        WHERE category = ? AND count >= ?
+        ORDER BY bayesian_rating {direction}, image_id {direction}
+        LIMIT ?
+        """,
+        [
+            category,
+            BAYESIAN_PRIOR_WEIGHT,
+            BAYESIAN_PRIOR_WEIGHT,
+            category,
+            min_count,
+            limit,
+        ],
+    )
+
+
+def get_category_baseline(db: Any, categories: list[str]) -> list[dict]:
+    """Stored aggregates for `categories`, as rows for `find_divergences`."""
+    if not categories:
+        return []
+    placeholders = ",".join("?" * len(categories))
+    return db.q(
+        f"""
+        SELECT category, image_id, sum, count
+        FROM image_rating_stats
+        WHERE category IN ({placeholders})
+        """,
+        list(categories),
+    )
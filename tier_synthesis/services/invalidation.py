@@ -0,0 +1,210 @@
+"""Cache invalidation events shared between worker processes.
+
+Write paths publish a typed event after their transaction commits; every
+in-process cache subscribes to the event types it depends on. With
+`INVALIDATION_BUS=sqlite` events are also appended to an `invalidation_log`
+table that every worker polls, so caches in other uvicorn workers catch up
+within `INVALIDATION_POLL_SECONDS`.
+"""
+
+from collections import defaultdict
+from dataclasses import asdict, dataclass
+from typing import Any, Callable
+from fasthtml.common import database
+import json
+import os
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+INVALIDATION_POLL_SECONDS = float(os.environ.get("INVALIDATION_POLL_SECONDS", 0.5))
+INVALIDATION_LOG_RETENTION_SECONDS = 300
+
+
+# ============================================================================
+# EVENTS
+# ============================================================================
+
+
+@dataclass(frozen=True)
+class CategoryChanged:
+    """Tierlists or images in `category`, or who they are shared with, changed.
+
+    `listing` marks writes that can add or remove a category from someone's
+    category filter: creates, deletes, category moves and share edits.
+    """
+
+    category: str
+    listing: bool = False
+
+
+@dataclass(frozen=True)
+class TierlistStatsChanged:
+    """Rating or comment counts of a tierlist in `category` changed."""
+
+    category: str
+
+
+@dataclass(frozen=True)
+class UserChanged:
+    """A user's name, avatar or permissions changed; every user when None."""
+
+    user_id: str | None = None
+
+
+@dataclass(frozen=True)
+class GroupsChanged:
+    """Groups or memberships changed, which moves access for many users."""
+
+
+@dataclass(frozen=True)
+class UserRatingChanged:
+    tierlist_id: int
+    user_id: str
+
+
+EVENT_TYPES = {
+    event_type.__name__: event_type
+    for event_type in (
+        CategoryChanged,
+        TierlistStatsChanged,
+        UserChanged,
+        GroupsChanged,
+        UserRatingChanged,
+    )
+}
+
+
+# ============================================================================
+# BUSES
+# ============================================================================
+
+
+class InvalidationBus:
+    """Delivers events to the handlers of this process only."""
+
+    def __init__(self):
+        self._handlers: dict[type, list[Callable[[Any], None]]] = defaultdict(list)
+
+    def subscribe(self, event_type: type, handler: Callable[[Any], None]) -> None:
+        self._handlers[event_type].append(handler)
+
+    def publish(self, event: Any) -> None:
+        self._dispatch(event)
+
+    def _dispatch(self, event: Any) -> None:
+        for handler in self._handlers.get(type(event), ()):
+            try:
+                handler(event)
+            except Exception:
+                logger.exception(f"Invalidation handler failed for {event!r}")
+
+
+class SQLiteInvalidationBus(InvalidationBus):
+    """Shares events between processes through a polled change-log table.
+
+    Events are applied locally right away, so a worker always reads its own
+    writes; other workers pick them up on their next poll.
+    """
+
+    def __init__(self, db_path: str, poll_seconds: float = INVALIDATION_POLL_SECONDS):
+        super().__init__()
+        self.poll_seconds = poll_seconds
+        self.origin = f"{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        self.db = database(db_path)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS invalidation_log (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                origin TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL
+            )
+        """)
+        self._last_seen = self.db.q(
+            "SELECT COALESCE(MAX(id), 0) AS last FROM invalidation_log"
+        )[0]["last"]
+        self._poller = threading.Thread(
+            target=self._poll_forever, name="invalidation-poller", daemon=True
+        )
+        self._poller.start()
+
+    def publish(self, event: Any) -> None:
+        self._dispatch(event)
+        try:
+            self.db.conn.execute(
+                "INSERT INTO invalidation_log (origin, kind, payload, created_at) VALUES (?, ?, ?, ?)",
+                (self.origin, type(event).__name__, json.dumps(asdict(event)), time.time()),
+            )
+        except Exception:
+            logger.exception(f"Could not share {event!r} with other workers")
+
+    def poll(self) -> int:
+        """Apply events other processes logged since the last poll."""
+        rows = self.db.q(
+            "SELECT id, origin, kind, payload FROM invalidation_log WHERE id > ? ORDER BY id",
+            [self._last_seen],
+        )
+        applied = 0
+        for row in rows:
+            self._last_seen = row["id"]
+            event_type = EVENT_TYPES.get(row["kind"])
+            if row["origin"] == self.origin or event_type is None:
+                continue
+            self._dispatch(event_type(**json.loads(row["payload"])))
+            applied += 1
+        return applied
+
+    def _prune(self) -> None:
+        self.db.conn.execute(
+            "DELETE FROM invalidation_log WHERE created_at < ?",
+            (time.time() - INVALIDATION_LOG_RETENTION_SECONDS,),
+        )
+
+    def _poll_forever(self) -> None:
+        last_prune = time.monotonic()
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.poll()
+                if time.monotonic() - last_prune > INVALIDATION_LOG_RETENTION_SECONDS:
+                    self._prune()
+                    last_prune = time.monotonic()
+            except Exception:
+                logger.exception("Polling the invalidation log failed")
+
+
+_invalidation_bus = None
+
+
+def get_invalidation_bus() -> InvalidationBus:
+    global _invalidation_bus
+    if _invalidation_bus is None:
+        kind = os.environ.get("INVALIDATION_BUS", "local").lower()
+        if kind == "sqlite":
+            _invalidation_bus = SQLiteInvalidationBus(
+                os.environ.get("DB_PATH", "app/database.db")
+            )
+        else:
+            _invalidation_bus = InvalidationBus()
+        logger.info(f"Using {type(_invalidation_bus).__name__} for cache invalidation")
+    return _invalidation_bus
+
+
+def publish(event: Any) -> None:
+    """Announce a committed write to every cache, in this and other workers.
+
+    The persisted data versions are bumped here, once, by the writing process.
+    """
+    from services.data_versions import bump_for_event
+
+    bump_for_event(event)
+    get_invalidation_bus().publish(event)
+
+
+def subscribe(event_type: type, handler: Callable[[Any], None]) -> None:
+    get_invalidation_bus().subscribe(event_type, handler)
@@ -0,0 +1,207 @@
+"""Persisted category factorizations.
+
+One fit per category data version: the full (admin) view of the category,
+stored under the persisted `data_versions` counter it was fitted for and
+under a fingerprint of the exact ratings, so an instance that restarts (or
+a freshly scaled worker) loads W and H instead of refitting. Each viewer's
+view is sliced out of that fit: the images they can see are columns of H,
+and the tierlists that rated any of them are rows of W. Factors are raw
+little-endian float32 bytes, read back with `np.frombuffer` as zero-copy
+views of the blob.
+"""
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any
+import hashlib
+import json
+import numpy as np
+
+# Newest fits kept per category, and the age after which older fits are
+# dropped regardless. Only the newest is normally read; the others cover
+# workers that haven't seen the latest write yet.
+MODEL_RETENTION_PER_CATEGORY = 4
+MODEL_RETENTION_DAYS = 30
+
+
+@dataclass
+class StoredModel:
+    id: int
+    category: str
+    source_version: int
+    data_version: str
+    n_components: int
+    W: np.ndarray  # tierlists × components
+    H: np.ndarray  # images × components
+    tierlist_ids: np.ndarray
+    owner_ids: list[str]
+    image_ids: np.ndarray
+    # Observed (row, column) cells, to find the rows a subset of columns touches
+    rows: np.ndarray
+    cols: np.ndarray
+    fitted_at: str
+
+
+def ratings_fingerprint(ratings_matrix: Any, image_ids, tierlist_ids) -> str:
+    """Hash of a ratings matrix: changes whenever its contents do."""
+    digest = hashlib.sha1()
+    for array in (
+        np.asarray(image_ids, dtype=np.int64),
+        np.asarray(tierlist_ids, dtype=np.int64),
+        np.asarray(ratings_matrix.rows, dtype=np.int64),
+        np.asarray(ratings_matrix.cols, dtype=np.int64),
+        np.asarray(ratings_matrix.values, dtype=np.float64),
+    ):
+        digest.update(array.tobytes())
+        digest.update(b"|")
+    return digest.hexdigest()[:20]
+
+
+def create_category_model_index(db: Any) -> None:
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_category_model_version "
+        "ON category_model (category, data_version, n_components)"
+    )
+    db.execute(
+        "CREATE INDEX IF NOT EXISTS idx_category_model_source "
+        "ON category_model (category, source_version)"
+    )
+
+
+def _factor_bytes(matrix: np.ndarray) -> bytes:
+    return np.ascontiguousarray(matrix, dtype="<f4").tobytes()
+
+
+def _factor_view(blob: bytes, rows: int, n_components: int) -> np.ndarray:
+    return np.frombuffer(blob, dtype="<f4").reshape(rows, n_components)
+
+
+def load_category_model(
+    db: Any,
+    category: str,
+    source_version: int | None = None,
+    data_version: str | None = None,
+) -> StoredModel | None:
+    """Newest fit of `category` for a data version counter or a ratings fingerprint."""
+    column, value = (
+        ("source_version", source_version)
+        if source_version is not None
+        else ("data_version", data_version)
+    )
+    rows = db.q(
+        f"""
+        SELECT * FROM category_model
+        WHERE category = ? AND {column} = ? AND tierlist_ids IS NOT NULL
+        ORDER BY id DESC LIMIT 1
+        """,
+        [category, value],
+    )
+    if not rows:
+        return None
+    row = rows[0]
+    observed = np.frombuffer(row["observed"], dtype="<i4").reshape(2, -1)
+    return StoredModel(
+        id=row["id"],
+        category=row["category"],
+        source_version=row["source_version"],
+        data_version=row["data_version"],
+        n_components=row["n_components"],
+        W=_factor_view(row["W"], row["n_tierlists"], row["n_components"]),
+        H=_factor_view(row["H"], row["n_images"], row["n_components"]),
+        tierlist_ids=np.frombuffer(row["tierlist_ids"], dtype="<i8"),
+        owner_ids=json.loads(row["owner_ids"]),
+        image_ids=np.frombuffer(row["image_ids"], dtype="<i8"),
+        rows=observed[0],
+        cols=observed[1],
+        fitted_at=row["fitted_at"],
+    )
+
+
+def latest_n_components(db: Any, category: str) -> int | None:
+    """Rank of the newest stored fit of `category`, without loading it."""
+    rows = db.q(
+        """
+        SELECT n_components FROM category_model
+        WHERE category = ? AND tierlist_ids IS NOT NULL
+        ORDER BY id DESC LIMIT 1
+        """,
+        [category],
+    )
+    return rows[0]["n_components"] if rows else None
+
+
+def relabel_category_model(db: Any, model_id: int, source_version: int) -> None:
+    """Record that a stored fit also matches a newer data version counter."""
+    db.conn.execute(
+        "UPDATE category_model SET source_version = ? WHERE id = ?",
+        (source_version, model_id),
+    )
+
+
+def save_category_model(
+    db: Any,
+    category: str,
+    source_version: int,
+    data_version: str,
+    W: np.ndarray,
+    H: np.ndarray,
+    ratings_matrix: Any,
+    tierlist_ids,
+    owner_ids: list[str],
+    image_ids,
+) -> None:
+    """Store a fit (H as images × components) and apply the retention policy."""
+    observed = np.concatenate(
+        [
+            np.asarray(ratings_matrix.rows, dtype="<i4"),
+            np.asarray(ratings_matrix.cols, dtype="<i4"),
+        ]
+    )
+    with db.conn:
+        db.conn.execute(
+            """
+            INSERT INTO category_model (
+                category, source_version, data_version, n_components, n_tierlists,
+                n_images, W, H, tierlist_ids, owner_ids, image_ids, observed, fitted_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """,
+            (
+                category,
+                source_version,
+                data_version,
+                W.shape[1],
+                W.shape[0],
+                H.shape[0],
+                _factor_bytes(W),
+                _factor_bytes(H),
+                np.asarray(tierlist_ids, dtype="<i8").tobytes(),
+                json.dumps(list(owner_ids)),
+                np.asarray(image_ids, dtype="<i8").tobytes(),
+                observed.tobytes(),
+                datetime.now().isoformat(),
+            ),
+        )
+        prune_category_models(db, category)
+
+
+def prune_category_models(db: Any, category: str | None = None) -> int:
+    """Drop fits beyond the retention policy; returns how many were removed."""
+    cutoff = (datetime.now() - timedelta(days=MODEL_RETENTION_DAYS)).isoformat()
+    where, params = ("WHERE category = ?", [category]) if category else ("", [])
+    with db.conn:
+        db.conn.execute(
+            f"""
+            DELETE FROM category_model WHERE id IN (
+                SELECT id FROM (
+                    SELECT
+                        id,
+                        fitted_at,
+                        ROW_NUMBER() OVER (PARTITION BY category ORDER BY id DESC) AS recency
+                    FROM category_model {where}
+                )
+                WHERE recency > ? OR (recency > 1 AND fitted_at < ?)
+            )
+            """,
+            [*params, MODEL_RETENTION_PER_CATEGORY, cutoff],
+        )
+        return db.conn.changes()
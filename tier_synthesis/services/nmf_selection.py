@@ -0,0 +1,110 @@
+"""Pick the number of NMF themes for a ratings matrix.
+
+Candidate ranks are fitted side by side in a process pool, each on the
+same training matrix with a slice of the observed ratings held out, and
+scored by how well they reconstruct those held-out ratings. The smallest
+rank within `RANK_TOLERANCE` of the best score wins, so extra themes have
+to earn their place.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from services.masked_nmf import ObservedRatings, masked_nmf
+import numpy as np
+import multiprocessing
+import os
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+CANDIDATE_RANKS = range(2, 9)
+HOLDOUT_FRACTION = 0.1
+MIN_HOLDOUT_RATINGS = 10
+RANK_TOLERANCE = 0.02
+NMF_WORKERS = int(os.environ.get("NMF_WORKERS", 0)) or os.cpu_count() or 1
+
+
+@dataclass
+class RankSelection:
+    n_components: int
+    # rank -> (held-out RMSE, training RMSE)
+    scores: dict[int, tuple[float, float]]
+
+
+def _fit_and_score(
+    train: ObservedRatings, test: ObservedRatings, rank: int
+) -> tuple[int, float, float]:
+    W, H, train_rmse = masked_nmf(train, rank)
+    rmse = float(np.sqrt(np.mean((test.predict(W, H) - test.values) ** 2)))
+    return rank, rmse, train_rmse
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            # Never fork the threaded server: its open SQLite connections,
+            # poller threads and BLAS pools don't survive into the child.
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            _executor = ProcessPoolExecutor(max_workers=NMF_WORKERS, mp_context=context)
+    return _executor
+
+
+def shutdown_executor() -> None:
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(cancel_futures=True)
+            _executor = None
+
+
+def select_n_components(
+    ratings_matrix: ObservedRatings, default: int = 3, ranks=CANDIDATE_RANKS
+) -> RankSelection:
+    """Choose a rank for `ratings_matrix` by held-out reconstruction error.
+
+    Falls back to `default` (capped by the matrix shape) when there are too
+    few ratings to hold any out meaningfully.
+    """
+    max_rank = min(ratings_matrix.shape)
+    fallback = RankSelection(min(default, max_rank), {})
+    candidates = [rank for rank in ranks if rank <= max_rank]
+
+    n_holdout = int(len(ratings_matrix) * HOLDOUT_FRACTION)
+    if len(candidates) < 2 or n_holdout < MIN_HOLDOUT_RATINGS:
+        return fallback
+
+    rng = np.random.default_rng(42)
+    held_out = np.zeros(len(ratings_matrix), dtype=bool)
+    held_out[rng.choice(len(ratings_matrix), n_holdout, replace=False)] = True
+    train, test = ratings_matrix.subset(~held_out), ratings_matrix.subset(held_out)
+
+    executor = _get_executor()
+    futures = [
+        executor.submit(_fit_and_score, train, test, rank) for rank in candidates
+    ]
+    try:
+        results = [future.result() for future in futures]
+    except Exception:
+        logger.exception("NMF rank selection failed; using the default rank")
+        return fallback
+
+    scores = {rank: (rmse, error) for rank, rmse, error in results}
+    best = min(rmse for rmse, _ in scores.values())
+    chosen = min(
+        rank for rank, (rmse, _) in scores.items() if rmse <= best * (1 + RANK_TOLERANCE)
+    )
+    logger.info(
+        f"Selected {chosen} NMF components from {len(candidates)} candidates "
+        f"(held-out RMSE {scores[chosen][0]:.3f}, best {best:.3f})"
+    )
+    return RankSelection(chosen, scores)
@@ -0,0 +1,72 @@
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Iterator
+import asyncio
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+@dataclass(eq=False)
+class _Subscriber:
+    loop: asyncio.AbstractEventLoop
+    queue: asyncio.Queue
+
+
+class EventBus:
+    """In-process fan-out of messages to async subscribers.
+
+    `publish` may be called from any thread (sync handlers run in a thread
+    pool); messages are handed to each subscriber's event loop. A subscriber
+    that falls more than `SUBSCRIBER_QUEUE_SIZE` messages behind loses the
+    overflow rather than slowing publishers down.
+    """
+
+    def __init__(self):
+        self._subscribers: dict[str, set[_Subscriber]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def subscribe(self, topic: str) -> Iterator[asyncio.Queue]:
+        """Queue receiving `topic` messages for as long as the block runs."""
+        subscriber = _Subscriber(
+            asyncio.get_running_loop(), asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        )
+        with self._lock:
+            self._subscribers.setdefault(topic, set()).add(subscriber)
+        try:
+            yield subscriber.queue
+        finally:
+            with self._lock:
+                self._subscribers[topic].discard(subscriber)
+
+    def publish(self, topic: str, message: Any) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscriber in subscribers:
+            try:
+                subscriber.loop.call_soon_threadsafe(_offer, subscriber.queue, message)
+            except RuntimeError:
+                # The subscriber's loop has shut down; it unsubscribes on exit.
+                pass
+
+
+def _offer(queue: asyncio.Queue, message: Any) -> None:
+    try:
+        queue.put_nowait(message)
+    except asyncio.QueueFull:
+        logger.debug("Dropping event for a subscriber that fell behind")
+
+
+_event_bus = None
+
+
+def get_event_bus() -> EventBus:
+    global _event_bus
+    if _event_bus is None:
+        _event_bus = EventBus()
+    return _event_bus
@@ -0,0 +1,56 @@
+"""Top-k cosine similarity without materialising the full N×N matrix.
+
+Vectors are L2-normalised once; a query is then a matrix-vector product
+against the normalised rows followed by `np.argpartition`, so memory and
+CPU grow with the number of rows rather than its square.
+"""
+
+import numpy as np
+
+
+class SimilarityIndex:
+    """Row-normalised vectors answering top-k cosine similarity queries."""
+
+    def __init__(self, vectors: np.ndarray):
+        vectors = np.nan_to_num(np.asarray(vectors, dtype=np.float64))
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        self.unit = vectors / np.where(norms > 0, norms, 1.0)
+
+    def __len__(self) -> int:
+        return self.unit.shape[0]
+
+    def similarities(self, rows: list[int]) -> np.ndarray:
+        """Cosine similarity of each of `rows` against every row, shape (len(rows), N)."""
+        return self.unit[rows] @ self.unit.T
+
+    def top_k(
+        self, rows: list[int], k: int, exclude_self: bool = True
+    ) -> list[list[tuple[int, float]]]:
+        """The `k` most similar rows to each of `rows`, best first, as (row, score)."""
+        if not rows or not len(self):
+            return [[] for _ in rows]
+
+        scores = self.similarities(rows)
+        if exclude_self:
+            scores[np.arange(len(rows)), rows] = -np.inf
+        return [_top_k(row_scores, k) for row_scores in scores]
+
+    def top_k_for_vector(self, vector: np.ndarray, k: int) -> list[tuple[int, float]]:
+        """The `k` rows most similar to an arbitrary query vector."""
+        vector = np.nan_to_num(np.asarray(vector, dtype=np.float64))
+        norm = np.linalg.norm(vector)
+        if not len(self) or norm == 0:
+            return []
+        return _top_k(self.unit @ (vector / norm), k)
+
+
+def _top_k(scores: np.ndarray, k: int) -> list[tuple[int, float]]:
+    k = min(k, len(scores))
+    if k <= 0:
+        return []
+    candidates = np.argpartition(-scores, k - 1)[:k]
+    # Highest score first; ties keep row order so results are stable.
+    candidates = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return [
+        (int(row), float(scores[row])) for row in candidates if np.isfinite(scores[row])
+    ]
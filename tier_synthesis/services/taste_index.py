@@ -0,0 +1,233 @@
+"""Cross-category "users most like me" index.
+
+Every category's factorization gives each user a taste vector in that
+category's theme space (the mean of their tierlists' normalized NMF rows).
+A user's overall taste is those per-category vectors side by side, so two
+users are compared on the categories they have both ranked.
+
+Vectors persist in the `taste_vector` table and are replaced a category at a
+time whenever a new factorization lands. Lookups use random-projection LSH:
+each category owns a fixed random projection (seeded from its name), a
+user's signature is the sign of the sum of their projected category vectors,
+and replacing one category only adjusts the projections of users in it.
+Bucket candidates are re-ranked by exact cosine similarity.
+"""
+
+from datetime import datetime
+from typing import Any, Callable
+from fasthtml.common import database
+import numpy as np
+import os
+import threading
+import zlib
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+TASTE_HASH_BITS = 10
+TASTE_HASH_TABLES = 6
+
+
+class TasteIndex:
+    """Approximate nearest-neighbour lookup over users' cross-category tastes."""
+
+    def __init__(
+        self, db: Any, bits: int = TASTE_HASH_BITS, tables: int = TASTE_HASH_TABLES
+    ):
+        self.db = db
+        self.bits = bits
+        self.tables = tables
+        self._vectors: dict[str, dict[str, np.ndarray]] = {}
+        self._projections: dict[str, np.ndarray] = {}
+        self._signatures: dict[str, np.ndarray] = {}
+        self._buckets: list[dict[int, set[str]]] = [{} for _ in range(tables)]
+        self._planes: dict[tuple[str, int], np.ndarray] = {}
+        self._bit_weights = 1 << np.arange(bits, dtype=np.int64)
+        self._lock = threading.Lock()
+
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS taste_vector (
+                user_id TEXT NOT NULL,
+                category TEXT NOT NULL,
+                vector BLOB NOT NULL,
+                updated_at TEXT NOT NULL,
+                PRIMARY KEY (user_id, category)
+            )
+        """)
+        self._load()
+
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+    def _load(self) -> None:
+        by_category: dict[str, dict[str, np.ndarray]] = {}
+        for row in self.db.q("SELECT user_id, category, vector FROM taste_vector"):
+            by_category.setdefault(row["category"], {})[row["user_id"]] = np.frombuffer(
+                row["vector"], dtype=np.float32
+            ).astype(np.float64)
+        for category, vectors in by_category.items():
+            self._replace_category(category, vectors)
+        logger.info(f"Taste index loaded for {len(self)} users")
+
+    # ------------------------------------------------------------------
+    # Updates
+    # ------------------------------------------------------------------
+
+    def update_category(self, category: str, vectors: dict[str, np.ndarray]) -> None:
+        """Replace every user's taste vector for `category` with `vectors`."""
+        now = datetime.now().isoformat()
+        # Round through float32 so memory matches what a reload would read.
+        stored = {
+            user_id: np.asarray(vector, np.float32) for user_id, vector in vectors.items()
+        }
+        with self._lock:
+            with self.db.conn:
+                self.db.conn.execute(
+                    "DELETE FROM taste_vector WHERE category = ?", (category,)
+                )
+                self.db.conn.executemany(
+                    "INSERT INTO taste_vector (user_id, category, vector, updated_at) VALUES (?, ?, ?, ?)",
+                    [
+                        (user_id, category, vector.tobytes(), now)
+                        for user_id, vector in stored.items()
+                    ],
+                )
+            self._replace_category(
+                category,
+                {user_id: vector.astype(np.float64) for user_id, vector in stored.items()},
+            )
+
+    def _category_planes(self, category: str, width: int) -> np.ndarray:
+        key = (category, width)
+        if key not in self._planes:
+            rng = np.random.default_rng(zlib.crc32(category.encode()))
+            self._planes[key] = rng.standard_normal((width, self.tables * self.bits))
+        return self._planes[key]
+
+    def _replace_category(self, category: str, vectors: dict[str, np.ndarray]) -> None:
+        affected = set(vectors)
+        for user_id, categories in self._vectors.items():
+            if category in categories:
+                affected.add(user_id)
+                old = categories[category]
+                self._projections[user_id] -= old @ self._category_planes(category, len(old))
+
+        for user_id, vector in vectors.items():
+            self._vectors.setdefault(user_id, {})[category] = vector
+            projection = self._projections.setdefault(
+                user_id, np.zeros(self.tables * self.bits)
+            )
+            projection += vector @ self._category_planes(category, len(vector))
+
+        for user_id in affected:
+            if user_id not in vectors:
+                del self._vectors[user_id][category]
+            self._rehash(user_id)
+
+    def _rehash(self, user_id: str) -> None:
+        old = self._signatures.pop(user_id, None)
+        if old is not None:
+            for table, signature in enumerate(old.tolist()):
+                bucket = self._buckets[table].get(signature)
+                if bucket is not None:
+                    bucket.discard(user_id)
+                    if not bucket:
+                        del self._buckets[table][signature]
+
+        if not self._vectors.get(user_id):
+            self._vectors.pop(user_id, None)
+            self._projections.pop(user_id, None)
+            return
+
+        bits = self._projections[user_id].reshape(self.tables, self.bits) > 0
+        signatures = bits.astype(np.int64) @ self._bit_weights
+        self._signatures[user_id] = signatures
+        for table, signature in enumerate(signatures.tolist()):
+            self._buckets[table].setdefault(signature, set()).add(user_id)
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def similarity(self, user_a: str, user_b: str) -> float:
+        """Exact cosine similarity of two users' concatenated category vectors."""
+        a, b = self._vectors.get(user_a, {}), self._vectors.get(user_b, {})
+        dot = sum(float(a[c] @ b[c]) for c in a.keys() & b.keys())
+        norm_a = np.sqrt(sum(float(v @ v) for v in a.values()))
+        norm_b = np.sqrt(sum(float(v @ v) for v in b.values()))
+        return dot / (norm_a * norm_b) if norm_a and norm_b else 0.0
+
+    def _candidates(self, user_id: str, k: int) -> set[str]:
+        signatures = self._signatures[user_id].tolist()
+        candidates: set[str] = set()
+        for table, signature in enumerate(signatures):
+            candidates |= self._buckets[table].get(signature, set())
+        if len(candidates) > k:
+            return candidates
+
+        # Multi-probe: neighbouring buckets one bit away.
+        for table, signature in enumerate(signatures):
+            for bit in range(self.bits):
+                candidates |= self._buckets[table].get(signature ^ (1 << bit), set())
+        return candidates
+
+    def most_similar(
+        self,
+        user_id: str,
+        k: int = 5,
+        allowed: Callable[[str], bool] | None = None,
+    ) -> list[tuple[str, float]]:
+        """Up to `k` users closest to `user_id`, best first, as (user_id, similarity).
+
+        `allowed` filters candidates (e.g. to users the viewer may see). When
+        the buckets hold too few allowed users, every indexed user is scored.
+        """
+        with self._lock:
+            if user_id not in self._signatures:
+                return []
+
+            def eligible(candidates):
+                return [
+                    other
+                    for other in candidates
+                    if other != user_id and (allowed is None or allowed(other))
+                ]
+
+            candidates = eligible(self._candidates(user_id, k))
+            if len(candidates) < k:
+                candidates = eligible(self._vectors)
+
+            scored = [(other, self.similarity(user_id, other)) for other in candidates]
+        scored = [(other, score) for other, score in scored if score > 0]
+        return sorted(scored, key=lambda item: (-item[1], item[0]))[:k]
+
+    def categories_in_common(self, user_a: str, user_b: str) -> list[str]:
+        return sorted(
+            self._vectors.get(user_a, {}).keys() & self._vectors.get(user_b, {}).keys()
+        )
+
+
+_taste_index = None
+_taste_index_lock = threading.Lock()
+
+
+def get_taste_index() -> TasteIndex:
+    global _taste_index
+    with _taste_index_lock:
+        if _taste_index is None:
+            _taste_index = TasteIndex(
+                database(os.environ.get("DB_PATH", "app/database.db"))
+            )
+    return _taste_index
+
+
+def user_taste_vectors(
+    owner_ids: list[str], W_normalized: np.ndarray
+) -> dict[str, np.ndarray]:
+    """Mean factorization row per owner: their taste in one category's themes."""
+    W = np.nan_to_num(np.asarray(W_normalized, dtype=np.float64))
+    owners = np.array(owner_ids, dtype=object)
+    return {
+        owner_id: W[owners == owner_id].mean(axis=0) for owner_id in dict.fromkeys(owner_ids)
+    }
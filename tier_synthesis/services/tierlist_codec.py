@@ -0,0 +1,100 @@
+"""Compact binary encoding for tierlist placements.
+
+Layout (little endian), version 1:
+
+    b"TL" | version: uint8 | tier count: uint8 | tier sizes: uint32[tiers]
+    | image ids: uint32[sum(sizes)]
+
+Ids are stored tier by tier in display order, so the tier boundaries are the
+running sum of the sizes. Rows written before this format hold JSON text such
+as ``{"S": ["12", "40"], ...}`` and are decoded transparently.
+"""
+
+import json
+import struct
+import numpy as np
+
+TIERS = ("S", "A", "B", "C", "D")
+TIER_TO_RATING = {"S": 5, "A": 4, "B": 3, "C": 2, "D": 1}
+
+FORMAT_MAGIC = b"TL"
+FORMAT_VERSION = 1
+
+_HEADER = struct.Struct("<2sBB")
+_ID_DTYPE = np.dtype("<u4")
+_TIER_RATINGS = np.array([TIER_TO_RATING[tier] for tier in TIERS], dtype=np.int8)
+
+
+def is_encoded(raw) -> bool:
+    return isinstance(raw, (bytes, bytearray, memoryview)) and bytes(
+        raw[:2]
+    ) == FORMAT_MAGIC
+
+
+def _parse_ids(values) -> list[int]:
+    ids = []
+    for value in values:
+        try:
+            ids.append(int(value))
+        except (TypeError, ValueError):
+            continue
+    return ids
+
+
+def encode_tierlist(data: dict) -> bytes:
+    """Encode a tier -> image ids mapping; unknown tiers are dropped."""
+    tier_ids = [_parse_ids(data.get(tier, [])) for tier in TIERS]
+    sizes = np.array([len(ids) for ids in tier_ids], dtype=_ID_DTYPE)
+    ids = np.array([i for ids in tier_ids for i in ids], dtype=_ID_DTYPE)
+    return (
+        _HEADER.pack(FORMAT_MAGIC, FORMAT_VERSION, len(TIERS))
+        + sizes.tobytes()
+        + ids.tobytes()
+    )
+
+
+def _decode_binary(raw) -> tuple[np.ndarray, np.ndarray]:
+    """Return (tier sizes, image ids) arrays for an encoded row."""
+    buffer = memoryview(raw)
+    magic, version, tier_count = _HEADER.unpack_from(buffer)
+    if magic != FORMAT_MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported tierlist encoding version {version}")
+    offset = _HEADER.size
+    sizes = np.frombuffer(buffer, dtype=_ID_DTYPE, count=tier_count, offset=offset)
+    offset += tier_count * _ID_DTYPE.itemsize
+    ids = np.frombuffer(buffer, dtype=_ID_DTYPE, count=int(sizes.sum()), offset=offset)
+    return sizes, ids
+
+
+def _load_legacy(raw) -> dict:
+    if isinstance(raw, dict):
+        return raw
+    if isinstance(raw, (bytes, bytearray, memoryview)):
+        raw = bytes(raw).decode()
+    return json.loads(raw) if raw else {}
+
+
+def decode_tierlist(raw) -> dict[str, list[int]]:
+    """Decode stored tierlist data (binary, legacy JSON or a dict) to tier -> ids."""
+    if is_encoded(raw):
+        sizes, ids = _decode_binary(raw)
+        bounds = [0, *np.cumsum(sizes).tolist()]
+        id_list = ids.tolist()
+        return {
+            tier: id_list[bounds[i] : bounds[i + 1]] for i, tier in enumerate(TIERS)
+        }
+
+    data = _load_legacy(raw)
+    return {tier: _parse_ids(data.get(tier, [])) for tier in TIERS}
+
+
+def decode_tierlist_arrays(raw) -> tuple[np.ndarray, np.ndarray]:
+    """Decode stored tierlist data to parallel (image ids, ratings) arrays."""
+    if is_encoded(raw):
+        sizes, ids = _decode_binary(raw)
+        return ids.astype(np.int64), np.repeat(_TIER_RATINGS, sizes)
+
+    data = decode_tierlist(raw)
+    ids = np.array([i for tier in TIERS for i in data[tier]], dtype=np.int64)
+    ratings = np.repeat(_TIER_RATINGS, [len(data[tier]) for tier in TIERS])
+    return ids, ratings
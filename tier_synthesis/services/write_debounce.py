@@ -0,0 +1,75 @@
+from typing import Any, Callable, Hashable
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class KeyedDebouncer:
+    """Hold the latest pending state per key and write it once things go quiet.
+
+    Every `update` restarts the key's `delay` timer, but a key is never held
+    back longer than `max_wait` after its first pending change. `write` runs
+    outside the debouncer's lock, so updates never wait on a slow write;
+    writes for one key are serialized, and `flush` returns only once any
+    write of that key already in progress has finished.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[Hashable, Any], None],
+        delay: float,
+        max_wait: float | None = None,
+    ):
+        self.delay = delay
+        self.max_wait = max_wait if max_wait is not None else delay * 5
+        self._write = write
+        self._pending: dict[Hashable, tuple[float, Any]] = {}
+        self._timers: dict[Hashable, threading.Timer] = {}
+        self._write_locks: dict[Hashable, threading.Lock] = {}
+        self._lock = threading.RLock()
+
+    def update(self, key: Hashable, change: Callable[[Any | None], Any]) -> Any:
+        """Replace the pending state for `key` with `change(pending_or_None)`.
+
+        Exceptions raised by `change` propagate and leave the pending state and
+        its timer untouched.
+        """
+        with self._lock:
+            first_at, pending = self._pending.get(key, (time.monotonic(), None))
+            state = change(pending)
+            self._pending[key] = (first_at, state)
+
+            timer = self._timers.pop(key, None)
+            if timer:
+                timer.cancel()
+            wait = min(self.delay, first_at + self.max_wait - time.monotonic())
+            timer = threading.Timer(max(wait, 0), self.flush, args=(key,))
+            timer.daemon = True
+            self._timers[key] = timer
+            timer.start()
+            return state
+
+    def flush(self, key: Hashable) -> None:
+        """Write the pending state for `key` now, if there is one."""
+        with self._lock:
+            write_lock = self._write_locks.setdefault(key, threading.Lock())
+        with write_lock:
+            with self._lock:
+                timer = self._timers.pop(key, None)
+                if timer:
+                    timer.cancel()
+                entry = self._pending.pop(key, None)
+            if entry is None:
+                return
+            try:
+                self._write(key, entry[1])
+            except Exception:
+                logger.exception(f"Debounced write for {key!r} failed")
+
+    def flush_all(self) -> None:
+        with self._lock:
+            keys = list(self._pending)
+        for key in keys:
+            self.flush(key)